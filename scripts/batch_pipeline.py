@@ -0,0 +1,80 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import time
+from src.pipeline.batch import run_batch
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='批量处理立体图像对（CSV/JSONL清单）')
+    parser.add_argument('manifest', help='图像对清单，CSV需包含left,right列（可选id），JSONL每行一个对象')
+    parser.add_argument('output', help='追加写入的JSONL结果文件，重新运行时跳过已完成的图像对；'
+                             '状态为error的图像对会重试，以最后一条记录为准')
+    parser.add_argument('--workers', type=int, default=None, help='进程数，默认为CPU核数')
+    parser.add_argument('--max-in-flight', type=int, default=None, help='同时在途的任务数上限')
+    parser.add_argument('--method', default='sift', choices=['sift', 'orb'])
+    parser.add_argument('--nfeatures', type=int, default=0)
+    parser.add_argument('--select', default=None, choices=['grid', 'anms'],
+                        help='检测后按网格分桶或ANMS选取空间分布均匀的关键点')
+    parser.add_argument('--max-keypoints', type=int, default=2000, help='关键点选取预算')
+    parser.add_argument('--tiles', type=int, nargs=2, default=None, metavar=('ROWS', 'COLS'),
+                        help='分块多线程检测：将图像划分为ROWS×COLS个重叠分块')
+    parser.add_argument('--tile-features', type=int, default=None, help='每个分块的特征点预算')
+    parser.add_argument('--threads', type=int, default=None, help='分块检测的线程数，默认为CPU核数')
+    parser.add_argument('--ratio', type=float, default=0.75)
+    parser.add_argument('--threshold', type=float, default=1.5)
+    parser.add_argument('--max-iters', type=int, default=2000)
+    parser.add_argument('--time-budget-ms', type=float, default=None,
+                        help='每个图像对的RANSAC时间预算（毫秒），超时返回当前最优模型')
+    parser.add_argument('--cache-dir', default=None, help='特征缓存目录（按图像内容哈希复用SIFT结果）')
+    parser.add_argument('--cache-size-mb', type=int, default=1024)
+    parser.add_argument('--guided-band', type=float, default=None,
+                        help='启用引导匹配：在估计F的极线带宽（像素）内重新匹配并重估F')
+    parser.add_argument('--reduction', type=int, default=None, choices=[2, 4, 8],
+                        help='由粗到精模式：按该倍数降采样解码估计F，再在全分辨率分块中细化')
+    parser.add_argument('--tile-size', type=int, default=256, help='由粗到精模式的全分辨率分块大小')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    config = {
+        'detector_params': {'method': args.method, 'nfeatures': args.nfeatures,
+                            'selection': args.select,
+                            'max_keypoints': args.max_keypoints if args.select else None,
+                            'tiles': args.tiles, 'tile_features': args.tile_features,
+                            'n_threads': args.threads},
+        'matcher_params': {'method': 'flann', 'ratio_threshold': args.ratio},
+        'ransac_params': {'max_iters': args.max_iters, 'threshold': args.threshold,
+                          'confidence': 0.99, 'sampler': 'prosac',
+                          'time_budget_ms': args.time_budget_ms},
+        'cache_dir': args.cache_dir,
+        'cache_max_bytes': args.cache_size_mb << 20,
+        'guided_params': {'band': args.guided_band} if args.guided_band else None,
+        'coarse_to_fine': ({'reduction': args.reduction, 'tile_size': args.tile_size}
+                           if args.reduction else None)
+    }
+
+    print("="*60)
+    print("批量两视图处理")
+    print("="*60)
+
+    start = time.perf_counter()
+
+    def progress(record, summary):
+        if summary['processed'] % 100 == 0:
+            elapsed = time.perf_counter() - start
+            print(f"- 已处理 {summary['processed']} 对, 失败 {summary['failed']}, "
+                  f"{summary['processed'] / elapsed:.1f} 对/秒")
+
+    summary = run_batch(args.manifest, args.output, config=config, n_workers=args.workers,
+                        max_in_flight=args.max_in_flight, progress=progress)
+
+    elapsed = time.perf_counter() - start
+    print(f"\n清单共 {summary['total']} 对, 跳过已完成 {summary['skipped']} 对")
+    print(f"本次处理 {summary['processed']} 对, 失败 {summary['failed']} 对, 用时 {elapsed:.1f}s")
+    print(f"结果已追加至 {args.output}")
+    print("="*60)
+
+if __name__ == '__main__':
+    main()
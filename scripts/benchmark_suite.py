@@ -0,0 +1,180 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+import numpy as np
+from src.core.fundamental_matrix import estimate_fundamental_8point
+from src.core.ransac import FundamentalMatrixRANSAC
+from src.core.residuals import (as_homogeneous, average_epipolar_distances,
+                                symmetric_epipolar_distances, sampson_distances)
+from src.utils.synthetic import generate_two_view_scene, fundamental_error
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='合成两视图基准测试（已知真值F）')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100000, 1000000])
+    parser.add_argument('--noise', type=float, nargs='+', default=[0.5], help='像素噪声标准差')
+    parser.add_argument('--outliers', type=float, nargs='+', default=[0.0, 0.3, 0.5], help='外点比例')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--max-iters', type=int, default=2000)
+    parser.add_argument('--threshold', type=float, default=1.5)
+    parser.add_argument('--solver', default='8point', choices=['8point', '7point', '5point'],
+                        help='5point为标定模式，使用场景的真实内参估计本质矩阵')
+    parser.add_argument('--refine', action='store_true',
+                        help='RANSAC后在内点上用LM最小化Sampson误差细化F')
+    parser.add_argument('--degeneracy', action='store_true',
+                        help='启用主平面退化检测，并通过平面加视差恢复F')
+    parser.add_argument('--verification', default='full', choices=['full', 'sprt'])
+    parser.add_argument('--batch-size', type=int, default=None)
+    parser.add_argument('--ransac-max-points', type=int, default=100000,
+                        help='超过该点数时跳过RANSAC计时')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='JSON结果文件')
+    parser.add_argument('--baseline', default=None, help='对比用的历史JSON结果')
+    args = parser.parse_args()
+    if args.degeneracy and args.solver == '5point':
+        parser.error('--degeneracy 仅适用于非标定求解器（7point、8point）')
+    return args
+
+def time_calls(func, repeats):
+    times = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return np.array(times), result
+
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def summarize(times, n_points, peak_bytes):
+    return {
+        'p50_ms': float(1e3 * np.percentile(times, 50)),
+        'p99_ms': float(1e3 * np.percentile(times, 99)),
+        'mean_ms': float(1e3 * np.mean(times)),
+        'throughput_pts_per_s': float(n_points / np.percentile(times, 50)),
+        'peak_mem_mb': peak_bytes / 2**20
+    }
+
+def gt_error(F, scene):
+    if F is None:
+        return {'f_error': None, 'gt_symmetric_mean': None}
+    distances = symmetric_epipolar_distances(F, scene['clean_left'], scene['clean_right'])
+    return {'f_error': float(fundamental_error(F, scene['F'])),
+            'gt_symmetric_mean': float(np.mean(distances))}
+
+def bench_case(n_points, noise, outlier_ratio, args):
+    scene = generate_two_view_scene(n_points, noise_std=noise, outlier_ratio=outlier_ratio,
+                                    seed=args.seed)
+    pts_left, pts_right = scene['pts_left'], scene['pts_right']
+    hom_left, hom_right = as_homogeneous(pts_left), as_homogeneous(pts_right)
+    inliers = scene['inlier_mask']
+    case = {'n_points': n_points, 'noise': noise, 'outlier_ratio': outlier_ratio, 'stages': {}}
+
+    def eight_point():
+        return estimate_fundamental_8point(pts_left[inliers], pts_right[inliers])
+    times, F = time_calls(eight_point, args.repeats)
+    case['stages']['8point'] = {**summarize(times, int(inliers.sum()), peak_memory(eight_point)),
+                                **gt_error(F, scene)}
+
+    for name, metric in (('average_distance', average_epipolar_distances),
+                         ('symmetric_distance', symmetric_epipolar_distances),
+                         ('sampson_distance', sampson_distances)):
+        def evaluate():
+            return metric(scene['F'], hom_left, hom_right)
+        times, _ = time_calls(evaluate, args.repeats)
+        case['stages'][name] = summarize(times, n_points, peak_memory(evaluate))
+
+    if n_points <= args.ransac_max_points:
+        iterations, inlier_counts, degenerate = [], [], []
+        seeds = iter(range(args.seed, args.seed + args.repeats + 1))
+        intrinsics = {}
+        if args.solver == '5point':
+            intrinsics = {'K_left': scene['K_left'], 'K_right': scene['K_right']}
+
+        def ransac_fit():
+            ransac = FundamentalMatrixRANSAC(max_iters=args.max_iters, threshold=args.threshold,
+                                             solver=args.solver, verification=args.verification,
+                                             batch_size=args.batch_size, seed=next(seeds),
+                                             refine=args.refine, degeneracy_check=args.degeneracy,
+                                             **intrinsics)
+            F, mask = ransac.fit(pts_left, pts_right)
+            iterations.append(ransac.actual_iters)
+            inlier_counts.append(int(np.sum(mask)) if mask is not None else 0)
+            degenerate.append(ransac.get_statistics().get('degenerate_samples', 0))
+            return F
+        times, F = time_calls(ransac_fit, args.repeats)
+        peak = peak_memory(ransac_fit)
+        case['stages']['ransac'] = {**summarize(times, n_points, peak), **gt_error(F, scene),
+                                    'iterations_p50': float(np.median(iterations[:args.repeats])),
+                                    'inlier_count_p50': float(np.median(inlier_counts[:args.repeats])),
+                                    'true_inliers': int(inliers.sum())}
+        if args.degeneracy:
+            case['stages']['ransac']['degenerate_samples'] = int(np.sum(degenerate[:args.repeats]))
+    return case
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'commit': commit, 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(), 'numpy': np.__version__,
+            'machine': platform.machine(), 'cpu_count': os.cpu_count()}
+
+def case_key(case):
+    return (case['n_points'], case['noise'], case['outlier_ratio'])
+
+def main():
+    args = parse_args()
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = {case_key(case): case for case in json.load(f)['cases']}
+
+    print("="*60)
+    print("合成两视图基准测试")
+    print("="*60)
+
+    results = {'environment': environment(), 'config': vars(args), 'cases': []}
+    for n_points in args.sizes:
+        for noise in args.noise:
+            for outlier_ratio in args.outliers:
+                case = bench_case(n_points, noise, outlier_ratio, args)
+                results['cases'].append(case)
+
+                print(f"\nN={n_points}, 噪声={noise}px, 外点比例={outlier_ratio:.0%}")
+                reference = baseline.get(case_key(case), {}).get('stages', {})
+                for name, stage in case['stages'].items():
+                    line = (f"- {name}: p50 {stage['p50_ms']:.2f}ms, p99 {stage['p99_ms']:.2f}ms, "
+                            f"{stage['throughput_pts_per_s']/1e6:.2f}M点/秒, 峰值内存 {stage['peak_mem_mb']:.1f}MB")
+                    if stage.get('f_error') is not None:
+                        line += f", F误差 {stage['f_error']:.2e}, 真值点误差 {stage['gt_symmetric_mean']:.3f}px²"
+                    if 'iterations_p50' in stage:
+                        line += f", 迭代 {stage['iterations_p50']:.0f}"
+                    if 'degenerate_samples' in stage:
+                        line += f", 退化样本 {stage['degenerate_samples']}"
+                    if name in reference:
+                        line += f" [相对基线 {stage['p50_ms'] / reference[name]['p50_ms']:.2f}x]"
+                    print(line)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n结果已保存至 {args.output}")
+    print("="*60)
+
+if __name__ == '__main__':
+    main()
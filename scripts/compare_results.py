@@ -2,47 +2,75 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+import argparse
 import numpy as np
 import json
+from src.utils.result_store import ResultStore
 
-def main():
+def parse_args():
     base_dir = os.path.join(os.path.dirname(__file__), '..')
-    results_dir = os.path.join(base_dir, 'results', 'comparison')
-    os.makedirs(results_dir, exist_ok=True)
+    parser = argparse.ArgumentParser(description='从结果库汇总并对比各任务的运行结果')
+    parser.add_argument('--store', default=os.path.join(base_dir, 'results', 'results.db'),
+                        help='结果库路径（由任务脚本写入）')
+    parser.add_argument('--output-dir', default=os.path.join(base_dir, 'results', 'comparison'))
+    return parser.parse_args()
+
+def summarize(runs):
+    summary = {'runs': int(len(runs['id']))}
+    columns = {'inlier_count': runs['inlier_count'], **runs['metrics'],
+               **{f"time_{name}": values for name, values in runs['timings'].items()}}
+    for name, values in columns.items():
+        finite = values[np.isfinite(values)]
+        if len(finite) == 0:
+            continue
+        summary[name] = {
+            'mean': float(np.mean(finite)),
+            'median': float(np.median(finite)),
+            'std': float(np.std(finite)),
+            'min': float(np.min(finite)),
+            'max': float(np.max(finite))
+        }
+
+    e_left, e_right = runs['e_left'], runs['e_right']
+    for key, epipoles in (('e_left', e_left), ('e_right', e_right)):
+        finite = epipoles[np.all(np.isfinite(epipoles), axis=1)]
+        if len(finite):
+            summary[f"{key}_median"] = np.median(finite, axis=0).tolist()
+            summary[f"{key}_spread_px"] = float(np.median(
+                np.linalg.norm(finite - np.median(finite, axis=0), axis=1)))
+    return summary
+
+def main():
+    args = parse_args()
+    os.makedirs(args.output_dir, exist_ok=True)
 
     print("="*60)
     print("任务对比分析")
     print("="*60)
 
-    task1_f_file = os.path.join(base_dir, 'results', 'task1', 'fundamental_matrix.txt')
-    task2_f_file = os.path.join(base_dir, 'results', 'task2', 'fundamental_matrix.txt')
-
-    task1_metrics_file = os.path.join(base_dir, 'results', 'task1', 'metrics.json')
-    task2_metrics_file = os.path.join(base_dir, 'results', 'task2', 'ransac_statistics.json')
-
-    with open(task1_metrics_file, 'r') as f:
-        task1_metrics = json.load(f)
+    if not os.path.exists(args.store):
+        print(f"\n未找到结果库 {args.store}，请先运行任务1和任务2脚本")
+        return
 
-    with open(task2_metrics_file, 'r') as f:
-        task2_metrics = json.load(f)
+    with ResultStore(args.store) as store:
+        runs = {task: store.query(task=task) for task in store.tasks()}
 
-    task1_epipole_file = os.path.join(base_dir, 'results', 'task1', 'epipoles.txt')
-    task2_epipole_file = os.path.join(base_dir, 'results', 'task2', 'epipoles.txt')
+    if 'task1' not in runs or 'task2' not in runs:
+        print("\n结果库中缺少任务1或任务2的记录")
+        return
 
-    with open(task1_epipole_file, 'r') as f:
-        lines = f.readlines()
-        task1_e_left = eval(lines[0].split(': ')[1].strip())
-        task1_e_right = eval(lines[1].split(': ')[1].strip())
+    latest = {task: {key: value[-1] for key, value in data.items()
+                     if key not in ('metrics', 'timings', 'task', 'run_id')}
+              for task, data in runs.items()}
+    metrics = {task: {name: values[-1] for name, values in data['metrics'].items()}
+               for task, data in runs.items()}
 
-    with open(task2_epipole_file, 'r') as f:
-        lines = f.readlines()
-        task2_e_left = eval(lines[0].split(': ')[1].strip())
-        task2_e_right = eval(lines[1].split(': ')[1].strip())
+    task1_e_left, task1_e_right = latest['task1']['e_left'], latest['task1']['e_right']
+    task2_e_left, task2_e_right = latest['task2']['e_left'], latest['task2']['e_right']
+    e_left_diff = np.linalg.norm(task1_e_left - task2_e_left)
+    e_right_diff = np.linalg.norm(task1_e_right - task2_e_right)
 
-    e_left_diff = np.sqrt((task1_e_left[0] - task2_e_left[0])**2 +
-                          (task1_e_left[1] - task2_e_left[1])**2)
-    e_right_diff = np.sqrt((task1_e_right[0] - task2_e_right[0])**2 +
-                           (task1_e_right[1] - task2_e_right[1])**2)
+    task1_metrics, task2_metrics = metrics['task1'], metrics['task2']
 
     print("\n极点对比:")
     print(f"任务1 左极点: ({task1_e_left[0]:.2f}, {task1_e_left[1]:.2f})")
@@ -62,25 +90,39 @@ def main():
           f"max={task2_metrics['symmetric_distance_max']:.2f}px")
 
     print("\n数据统计:")
-    print(f"任务1 匹配点数: {task1_metrics['num_matches']}")
-    print(f"任务2 SIFT特征: 左{task2_metrics['num_features_left']} 右{task2_metrics['num_features_right']}")
-    print(f"任务2 初始匹配: {task2_metrics['num_initial_matches']}")
-    print(f"任务2 RANSAC内点: {task2_metrics['ransac_inlier_count']} ({100*task2_metrics['ransac_inlier_ratio']:.1f}%)")
+    print(f"任务1 匹配点数: {int(task1_metrics['num_matches'])}")
+    print(f"任务2 SIFT特征: 左{int(task2_metrics['num_features_left'])} "
+          f"右{int(task2_metrics['num_features_right'])}")
+    print(f"任务2 初始匹配: {int(task2_metrics['num_initial_matches'])}")
+    print(f"任务2 RANSAC内点: {int(task2_metrics['ransac_inlier_count'])} "
+          f"({100*task2_metrics['ransac_inlier_ratio']:.1f}%)")
+
+    summaries = {task: summarize(data) for task, data in runs.items()}
+    print("\n历史运行汇总:")
+    for task, summary in summaries.items():
+        line = f"{task}: {summary['runs']} 次运行"
+        if 'symmetric_distance_mean' in summary:
+            stat = summary['symmetric_distance_mean']
+            line += f", 平均误差 median={stat['median']:.2f}px (min={stat['min']:.2f}, max={stat['max']:.2f})"
+        if 'e_left_spread_px' in summary:
+            line += f", 左极点离散度 {summary['e_left_spread_px']:.2f}px"
+        print(line)
 
     comparison_data = {
         'epipole_left_diff_px': float(e_left_diff),
         'epipole_right_diff_px': float(e_right_diff),
-        'task1_mean_error': task1_metrics['symmetric_distance_mean'],
-        'task2_mean_error': task2_metrics['symmetric_distance_mean'],
-        'task1_num_matches': task1_metrics['num_matches'],
-        'task2_num_inliers': task2_metrics['ransac_inlier_count'],
-        'task2_inlier_ratio': task2_metrics['ransac_inlier_ratio']
+        'task1_mean_error': float(task1_metrics['symmetric_distance_mean']),
+        'task2_mean_error': float(task2_metrics['symmetric_distance_mean']),
+        'task1_num_matches': int(task1_metrics['num_matches']),
+        'task2_num_inliers': int(task2_metrics['ransac_inlier_count']),
+        'task2_inlier_ratio': float(task2_metrics['ransac_inlier_ratio']),
+        'runs': summaries
     }
 
-    with open(os.path.join(results_dir, 'comparison.json'), 'w') as f:
+    with open(os.path.join(args.output_dir, 'comparison.json'), 'w') as f:
         json.dump(comparison_data, f, indent=2)
 
-    with open(os.path.join(results_dir, 'comparison.txt'), 'w') as f:
+    with open(os.path.join(args.output_dir, 'comparison.txt'), 'w') as f:
         f.write("="*60 + "\n")
         f.write("任务对比分析\n")
         f.write("="*60 + "\n\n")
@@ -95,7 +137,7 @@ def main():
         f.write(f"任务1: mean={task1_metrics['symmetric_distance_mean']:.2f}px\n")
         f.write(f"任务2: mean={task2_metrics['symmetric_distance_mean']:.2f}px\n")
 
-    print(f"\n对比结果已保存至 {results_dir}/")
+    print(f"\n对比结果已保存至 {args.output_dir}/")
     print("="*60)
 
 if __name__ == '__main__':
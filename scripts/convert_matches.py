@@ -0,0 +1,33 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import time
+from src.utils.match_io import convert_text_matches, open_correspondences
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='将文本匹配文件（x y x\' y\' [score [idx idx\']]）转换为二进制对应点格式')
+    parser.add_argument('input', help='文本匹配文件，每行一个对应点')
+    parser.add_argument('output', help='输出的二进制文件，可通过np.memmap零拷贝加载')
+    parser.add_argument('--chunk-size', type=int, default=1 << 20, help='每次解析的行数')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    count = convert_text_matches(args.input, args.output, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    data = open_correspondences(args.output)
+    columns = ['x', 'y', "x'", "y'"]
+    if data['scores'] is not None:
+        columns.append('score')
+    if data['desc_idx'] is not None:
+        columns.extend(['idx', "idx'"])
+
+    print(f"已转换 {count} 个对应点, 列: {', '.join(columns)}")
+    print(f"输出文件 {args.output} ({os.path.getsize(args.output) / 1024:.1f} KB), 用时 {elapsed:.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import argparse
+import glob
+import json
+import cv2
+from src.pipeline.sequence import SequencePipeline
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='视频/图像序列模式：复用相邻帧特征并以前一帧F作为RANSAC初值')
+    parser.add_argument('input', help='视频文件、图像目录或通配符（如 frames/*.png）')
+    parser.add_argument('--output', default=None, help='逐帧结果JSONL文件')
+    parser.add_argument('--max-frames', type=int, default=None)
+    parser.add_argument('--method', default='sift', choices=['sift', 'orb'])
+    parser.add_argument('--nfeatures', type=int, default=1000)
+    parser.add_argument('--ratio', type=float, default=0.75)
+    parser.add_argument('--threshold', type=float, default=1.5)
+    parser.add_argument('--max-iters', type=int, default=2000)
+    parser.add_argument('--reuse-ratio', type=float, default=0.8,
+                        help='前一帧F的内点数达到上一帧内点率的该比例时直接复用')
+    parser.add_argument('--budget-ms', type=float, default=30.0, help='每帧耗时预算')
+    return parser.parse_args()
+
+def read_frames(source, max_frames=None):
+    if os.path.isdir(source):
+        paths = sorted(os.path.join(source, name) for name in os.listdir(source)
+                       if name.lower().endswith(IMAGE_EXTENSIONS))
+    elif any(ch in source for ch in '*?['):
+        paths = sorted(glob.glob(source))
+    else:
+        paths = None
+
+    if paths is not None:
+        for i, path in enumerate(paths):
+            if max_frames is not None and i >= max_frames:
+                return
+            frame = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if frame is not None:
+                yield frame
+        return
+
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise IOError(f"Failed to open video: {source}")
+    try:
+        read = 0
+        while max_frames is None or read < max_frames:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            read += 1
+            yield cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    finally:
+        capture.release()
+
+def main():
+    args = parse_args()
+    pipeline = SequencePipeline(
+        detector_params={'method': args.method, 'nfeatures': args.nfeatures},
+        matcher_params={'method': 'flann', 'ratio_threshold': args.ratio},
+        ransac_params={'max_iters': args.max_iters, 'threshold': args.threshold,
+                       'confidence': 0.99, 'sampler': 'prosac'},
+        reuse_ratio=args.reuse_ratio, budget_ms=args.budget_ms)
+
+    print("="*60)
+    print("序列模式")
+    print("="*60)
+
+    out = open(args.output, 'w') if args.output else None
+    try:
+        for frame in read_frames(args.input, args.max_frames):
+            result = pipeline.process_frame(frame)
+            if out is not None:
+                record = {
+                    'frame': result['frame'],
+                    'F': result['F'].ravel().tolist() if result['F'] is not None else None,
+                    'num_features': result['num_features'],
+                    'num_matches': result['num_matches'],
+                    'inlier_count': result['inlier_count'],
+                    'seeded': result['seeded'],
+                    'reused': result['reused'],
+                    'timings_ms': {k: 1e3 * v for k, v in result['timings'].items()}
+                }
+                out.write(json.dumps(record) + '\n')
+            if result['frame'] % 50 == 0:
+                print(f"- 帧 {result['frame']}: 匹配 {result['num_matches']}, 内点 {result['inlier_count']}, "
+                      f"耗时 {1e3 * result['timings']['total']:.1f}ms"
+                      f"{' (复用F)' if result['reused'] else ''}")
+    finally:
+        if out is not None:
+            out.close()
+
+    stats = pipeline.get_statistics()
+    if not stats:
+        print("\n未读取到任何帧")
+        return
+    print(f"\n共 {stats['frames']} 帧, 延迟 mean={stats['latency_mean_ms']:.1f}ms, "
+          f"p50={stats['latency_p50_ms']:.1f}ms, p95={stats['latency_p95_ms']:.1f}ms, "
+          f"max={stats['latency_max_ms']:.1f}ms")
+    print(f"以前一帧F为初值 {stats['seeded_frames']} 帧, 直接复用 {stats['reused_frames']} 帧")
+    print(f"超出 {stats['budget_ms']:.0f}ms 预算的帧: {stats['over_budget_frames']}")
+    print("="*60)
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,7 @@ import numpy as np
 import cv2
 import json
 from src.utils.io_utils import load_matches, load_images
+from src.utils.result_store import ResultStore
 from src.core.fundamental_matrix import estimate_fundamental_8point
 from src.core.epipolar_geometry import compute_epipoles, compute_symmetric_epipolar_distance
 from src.visualization.epipolar_vis import draw_epipolar_lines
@@ -89,6 +90,10 @@ def main():
     with open(os.path.join(results_dir, 'metrics.json'), 'w') as f:
         json.dump(metrics, f, indent=2)
 
+    with ResultStore(os.path.join(base_dir, 'results', 'results.db')) as store:
+        store.add('task1', F, epipoles=(e_left, e_right), metrics=metrics,
+                  params={'matches_file': os.path.basename(matches_file)})
+
     print(f"\n结果已保存至 {results_dir}/")
     print("="*60)
 
@@ -5,14 +5,25 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 import numpy as np
 import cv2
 import json
+import argparse
 from src.utils.io_utils import load_images
+from src.utils.result_store import ResultStore
+from src.utils.profiling import enable_profiling, span
 from src.features.detector import FeatureDetector
 from src.features.matcher import FeatureMatcher
 from src.core.ransac import FundamentalMatrixRANSAC
 from src.core.epipolar_geometry import compute_epipoles, compute_symmetric_epipolar_distance
 from src.visualization.epipolar_vis import draw_epipolar_lines, draw_matches_with_inliers
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='任务2：完整特征检测+RANSAC流程')
+    parser.add_argument('--trace', default=None,
+                        help='保存各阶段耗时的Chrome trace文件（chrome://tracing 或 Perfetto 打开）')
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    profiler = enable_profiling() if args.trace else None
     base_dir = os.path.join(os.path.dirname(__file__), '..')
     data_dir = base_dir
     results_dir = os.path.join(base_dir, 'results', 'task2')
@@ -25,45 +36,52 @@ def main():
     left_img_path = os.path.join(data_dir, 'left_upscaled.jpg')
     right_img_path = os.path.join(data_dir, 'right_upscaled.jpg')
 
-    img_left, img_right = load_images(left_img_path, right_img_path)
+    with span('load'):
+        img_left, img_right = load_images(left_img_path, right_img_path)
 
     print("\n特征检测:")
     detector = FeatureDetector(method='sift', nfeatures=0, contrastThreshold=0.03)
 
-    kp_left, desc_left = detector.detect_and_compute(img_left)
-    kp_right, desc_right = detector.detect_and_compute(img_right)
+    with span('detect'):
+        kp_left, desc_left = detector.detect_and_compute(img_left)
+        kp_right, desc_right = detector.detect_and_compute(img_right)
 
     print(f"- 左图检测到 {len(kp_left)} 个SIFT特征点")
     print(f"- 右图检测到 {len(kp_right)} 个SIFT特征点")
 
-    img_kp_left = detector.visualize_keypoints(img_left, kp_left)
-    img_kp_right = detector.visualize_keypoints(img_right, kp_right)
+    with span('visualize', stage='keypoints'):
+        img_kp_left = detector.visualize_keypoints(img_left, kp_left)
+        img_kp_right = detector.visualize_keypoints(img_right, kp_right)
 
-    h_left, w_left = img_left.shape[:2]
-    h_right, w_right = img_right.shape[:2]
-    max_h = max(h_left, h_right)
-    img_kp_combined = np.zeros((max_h, w_left + w_right, 3), dtype=np.uint8)
-    img_kp_combined[:h_left, :w_left] = img_kp_left
-    img_kp_combined[:h_right, w_left:w_left+w_right] = img_kp_right
-    cv2.imwrite(os.path.join(results_dir, 'detected_features.png'), img_kp_combined)
+        h_left, w_left = img_left.shape[:2]
+        h_right, w_right = img_right.shape[:2]
+        max_h = max(h_left, h_right)
+        img_kp_combined = np.zeros((max_h, w_left + w_right, 3), dtype=np.uint8)
+        img_kp_combined[:h_left, :w_left] = img_kp_left
+        img_kp_combined[:h_right, w_left:w_left+w_right] = img_kp_right
+        cv2.imwrite(os.path.join(results_dir, 'detected_features.png'), img_kp_combined)
 
     print("\n特征匹配:")
     matcher = FeatureMatcher(method='flann', ratio_threshold=0.75)
-    matches = matcher.match(desc_left, desc_right)
+    with span('match'):
+        matches, scores = matcher.match(desc_left, desc_right, return_scores=True)
     print(f"- Ratio test后: {len(matches)} 对")
 
     pts_left, pts_right = matcher.extract_matched_points(kp_left, kp_right, matches)
 
     print("\nRANSAC估计:")
-    ransac = FundamentalMatrixRANSAC(max_iters=2000, threshold=1.5, confidence=0.99)
-    F, inlier_mask = ransac.fit(pts_left, pts_right)
+    ransac = FundamentalMatrixRANSAC(max_iters=2000, threshold=1.5, confidence=0.99,
+                                     sampler='prosac')
+    with span('ransac'):
+        F, inlier_mask = ransac.fit(pts_left, pts_right, scores=scores)
 
     stats = ransac.get_statistics()
     print(f"- 收敛于迭代 {stats['actual_iterations']}, 最终内点: {stats['inlier_count']}/{stats['total_count']} ({100*stats['inlier_ratio']:.1f}%)")
 
-    img_matches_inliers = draw_matches_with_inliers(img_left, kp_left, img_right, kp_right,
-                                                     matches, inlier_mask)
-    cv2.imwrite(os.path.join(results_dir, 'ransac_inliers.png'), img_matches_inliers)
+    with span('visualize', stage='matches'):
+        img_matches_inliers = draw_matches_with_inliers(img_left, kp_left, img_right, kp_right,
+                                                         matches, inlier_mask)
+        cv2.imwrite(os.path.join(results_dir, 'ransac_inliers.png'), img_matches_inliers)
 
     print("\n极点计算:")
     e_left, e_right = compute_epipoles(F)
@@ -78,13 +96,14 @@ def main():
     print(f"\n评估指标:")
     print(f"- 内点平均误差: {mean_dist:.2f}px")
 
-    img_left_with_lines = draw_epipolar_lines(img_left, F, inlier_pts_right[:20], e_left,
-                                               direction='right_to_left', num_lines=20)
-    img_right_with_lines = draw_epipolar_lines(img_right, F, inlier_pts_left[:20], e_right,
-                                                direction='left_to_right', num_lines=20)
+    with span('visualize', stage='epipolar_lines'):
+        img_left_with_lines = draw_epipolar_lines(img_left, F, inlier_pts_right[:20], e_left,
+                                                   direction='right_to_left', num_lines=20)
+        img_right_with_lines = draw_epipolar_lines(img_right, F, inlier_pts_left[:20], e_right,
+                                                    direction='left_to_right', num_lines=20)
 
-    cv2.imwrite(os.path.join(results_dir, 'left_epipolar_lines.png'), img_left_with_lines)
-    cv2.imwrite(os.path.join(results_dir, 'right_epipolar_lines.png'), img_right_with_lines)
+        cv2.imwrite(os.path.join(results_dir, 'left_epipolar_lines.png'), img_left_with_lines)
+        cv2.imwrite(os.path.join(results_dir, 'right_epipolar_lines.png'), img_right_with_lines)
 
     with open(os.path.join(results_dir, 'fundamental_matrix.txt'), 'w') as f:
         f.write("Fundamental Matrix F:\n")
@@ -109,7 +128,24 @@ def main():
     with open(os.path.join(results_dir, 'ransac_statistics.json'), 'w') as f:
         json.dump(metrics, f, indent=2)
 
+    with ResultStore(os.path.join(base_dir, 'results', 'results.db')) as store:
+        store.add('task2', F, inlier_mask=inlier_mask, epipoles=(e_left, e_right),
+                  metrics={**metrics, **stats},
+                  params={'detector': detector.get_params(), 'ratio_threshold': 0.75,
+                          'max_iters': 2000, 'threshold': 1.5, 'confidence': 0.99,
+                          'sampler': 'prosac'})
+
     print(f"\n结果已保存至 {results_dir}/")
+
+    if profiler is not None:
+        summary = profiler.summary()
+        print("\n阶段耗时:")
+        for name, stage in summary['spans'].items():
+            print(f"- {name}: {stage['total_ms']:.1f}ms ({stage['calls']}次)")
+        for name, value in summary['counters'].items():
+            print(f"- {name}: {value:.0f}")
+        profiler.save_chrome_trace(args.trace)
+        print(f"Trace已保存至 {args.trace}")
     print("="*60)
 
 if __name__ == '__main__':
@@ -0,0 +1,84 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import time
+import argparse
+from src.utils.io_utils import load_images
+from src.features.detector import FeatureDetector
+from src.features.matcher import FeatureMatcher
+from src.core.threshold_sweep import ThresholdSweepRANSAC
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='RANSAC阈值扫描：检测、匹配一次，残差复用于所有阈值')
+    parser.add_argument('--left', default=None, help='左图路径，默认为left_upscaled.jpg')
+    parser.add_argument('--right', default=None, help='右图路径，默认为right_upscaled.jpg')
+    parser.add_argument('--thresholds', type=float, nargs='+',
+                        default=[0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0], help='待评估的内点阈值（像素）')
+    parser.add_argument('--max-iters', type=int, default=2000)
+    parser.add_argument('--confidence', type=float, default=0.99)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--ratio', type=float, default=0.75)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None,
+                        help='JSON结果文件，默认为results/threshold_sweep/threshold_sweep.json')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    base_dir = os.path.join(os.path.dirname(__file__), '..')
+    left_img_path = args.left or os.path.join(base_dir, 'left_upscaled.jpg')
+    right_img_path = args.right or os.path.join(base_dir, 'right_upscaled.jpg')
+    output = args.output or os.path.join(base_dir, 'results', 'threshold_sweep', 'threshold_sweep.json')
+
+    print("="*60)
+    print("RANSAC阈值扫描")
+    print("="*60)
+
+    img_left, img_right = load_images(left_img_path, right_img_path)
+
+    start = time.perf_counter()
+    detector = FeatureDetector(method='sift', nfeatures=0, contrastThreshold=0.03)
+    kp_left, desc_left = detector.detect_and_compute(img_left)
+    kp_right, desc_right = detector.detect_and_compute(img_right)
+    matcher = FeatureMatcher(method='flann', ratio_threshold=args.ratio)
+    matches, scores = matcher.match(desc_left, desc_right, return_scores=True)
+    pts_left, pts_right = matcher.extract_matched_points(kp_left, kp_right, matches)
+    frontend_time = time.perf_counter() - start
+    print(f"\n特征: 左图 {len(kp_left)}, 右图 {len(kp_right)}, 匹配 {len(matches)} 对 "
+          f"(用时 {1e3 * frontend_time:.1f}ms)")
+
+    start = time.perf_counter()
+    sweep = ThresholdSweepRANSAC(args.thresholds, max_iters=args.max_iters,
+                                 confidence=args.confidence, batch_size=args.batch_size,
+                                 sampler='prosac', seed=args.seed)
+    results = sweep.fit(pts_left, pts_right, scores=scores)
+    sweep_time = time.perf_counter() - start
+    stats = sweep.get_statistics()
+    print(f"\n扫描 {len(results)} 个阈值, 迭代 {stats['actual_iterations']}, "
+          f"用时 {1e3 * sweep_time:.1f}ms")
+
+    print(f"\n{'阈值':>8} {'内点数':>8} {'内点比例':>8} {'平均误差':>10} {'中位误差':>10}")
+    for result in results:
+        if result['F'] is None:
+            print(f"{result['threshold']:>8.2f} {'-':>8} {'-':>8} {'-':>10} {'-':>10}")
+            continue
+        print(f"{result['threshold']:>8.2f} {result['inlier_count']:>8d} "
+              f"{100 * result['inlier_ratio']:>7.1f}% {result['symmetric_distance_mean']:>9.3f}px "
+              f"{result['symmetric_distance_median']:>9.3f}px")
+
+    records = [{**{k: v for k, v in result.items() if k not in ('F', 'inlier_mask')},
+                'F': result['F'].tolist() if result['F'] is not None else None}
+               for result in results]
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({'num_matches': len(matches), 'frontend_time_ms': 1e3 * frontend_time,
+                   'sweep_time_ms': 1e3 * sweep_time, 'statistics': stats,
+                   'results': records}, f, indent=2)
+
+    print(f"\n结果已保存至 {output}")
+    print("="*60)
+
+if __name__ == '__main__':
+    main()
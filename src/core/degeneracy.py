@@ -0,0 +1,124 @@
+from itertools import combinations
+import numpy as np
+from .fundamental_matrix import normalize_points
+from .residuals import as_homogeneous
+from ..utils.profiling import count
+
+def skew_batch(v):
+    S = np.zeros(v.shape[:-1] + (3, 3))
+    S[..., 0, 1], S[..., 0, 2] = -v[..., 2], v[..., 1]
+    S[..., 1, 0], S[..., 1, 2] = v[..., 2], -v[..., 0]
+    S[..., 2, 0], S[..., 2, 1] = -v[..., 1], v[..., 0]
+    return S
+
+def right_epipole(F):
+    return np.linalg.svd(F)[0][:, 2]
+
+def homographies_from_fundamental(F, x, xp, triplets):
+    e_right = right_epipole(F)
+    A = skew_batch(e_right) @ F
+    X, Xp = x[triplets], xp[triplets]
+    c1 = np.cross(Xp, X @ A.T)
+    c2 = np.cross(Xp, e_right)
+    b = np.sum(c1 * c2, axis=-1) / np.maximum(np.sum(c2 * c2, axis=-1), 1e-300)
+    v = np.linalg.solve(X, b[..., None])[..., 0]
+    return A - e_right[:, None] * v[..., None, :]
+
+def transfer_errors(H, x, xp):
+    projected = x @ np.swapaxes(H, -1, -2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        diff = projected[..., :2] / projected[..., 2:] - xp[:, :2]
+    return np.sqrt(np.sum(diff**2, axis=-1))
+
+def estimate_homography(pts_left, pts_right):
+    T_left, norm_left = normalize_points(pts_left)
+    T_right, norm_right = normalize_points(pts_right)
+    x, y = norm_left[:, 0], norm_left[:, 1]
+    u, v = norm_right[:, 0], norm_right[:, 1]
+    zeros, ones = np.zeros_like(x), np.ones_like(x)
+    A = np.concatenate([
+        np.stack([-x, -y, -ones, zeros, zeros, zeros, u * x, u * y, u], axis=1),
+        np.stack([zeros, zeros, zeros, -x, -y, -ones, v * x, v * y, v], axis=1)])
+    H = np.linalg.svd(A)[2][-1].reshape(3, 3)
+    return np.linalg.inv(T_right) @ H @ T_left
+
+class DegeneracyChecker:
+    def __init__(self, threshold, distance_fn, rng, min_plane_points=5, parallax_iters=100,
+                 homography_threshold=None):
+        self.threshold = threshold
+        self.distance_fn = distance_fn
+        self.rng = rng
+        self.min_plane_points = min_plane_points
+        self.parallax_iters = parallax_iters
+        self.homography_threshold = homography_threshold or 2 * threshold
+        self._triplets = {}
+
+        self.tests = 0
+        self.degenerate = 0
+        self.recovered = 0
+
+    def triplets(self, sample_size):
+        if sample_size not in self._triplets:
+            self._triplets[sample_size] = np.array(list(combinations(range(sample_size), 3)))
+        return self._triplets[sample_size]
+
+    def find_plane(self, F, sample_left, sample_right):
+        self.tests += 1
+        count('ransac.degeneracy_tests')
+        x, xp = as_homogeneous(sample_left), as_homogeneous(sample_right)
+        try:
+            H = homographies_from_fundamental(F, x, xp, self.triplets(len(x)))
+        except np.linalg.LinAlgError:
+            return None
+        support = np.sum(transfer_errors(H, x, xp) < self.homography_threshold, axis=1)
+        best = np.argmax(support)
+        if support[best] < self.min_plane_points:
+            return None
+        self.degenerate += 1
+        count('ransac.degenerate_samples')
+        return H[best]
+
+    def refit_homography(self, H, hom_left, hom_right, iterations=2):
+        for _ in range(iterations):
+            on_plane = transfer_errors(H, hom_left, hom_right) < self.homography_threshold
+            if np.sum(on_plane) < self.min_plane_points:
+                break
+            H = estimate_homography(hom_left[on_plane, :2], hom_right[on_plane, :2])
+        return H
+
+    def plane_and_parallax(self, H, hom_left, hom_right):
+        H = self.refit_homography(H, hom_left, hom_right)
+        off_plane = np.flatnonzero(transfer_errors(H, hom_left, hom_right) >= self.homography_threshold)
+        if len(off_plane) < 2:
+            return None, None, 0
+
+        pairs = off_plane[self.rng.integers(0, len(off_plane), size=(self.parallax_iters, 2))]
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+        if len(pairs) == 0:
+            return None, None, 0
+        lines = np.cross(hom_right[pairs], hom_left[pairs] @ H.T)
+        e_right = np.cross(lines[:, 0], lines[:, 1])
+        candidates = skew_batch(e_right) @ H
+        with np.errstate(divide='ignore', invalid='ignore'):
+            masks = self.distance_fn(candidates, hom_left, hom_right) < self.threshold
+        support = np.sum(masks, axis=1)
+        best = np.argmax(support)
+        return candidates[best], masks[best], int(support[best])
+
+    def check(self, F, inlier_count, inlier_mask, sample_left, sample_right, hom_left, hom_right):
+        H = self.find_plane(F, sample_left, sample_right)
+        if H is None:
+            return F, inlier_count, inlier_mask
+        F_parallax, mask, support = self.plane_and_parallax(H, hom_left, hom_right)
+        if support > inlier_count:
+            self.recovered += 1
+            count('ransac.parallax_recoveries')
+            return F_parallax, support, mask
+        return F, inlier_count, inlier_mask
+
+    def get_statistics(self):
+        return {
+            'degeneracy_tests': int(self.tests),
+            'degenerate_samples': int(self.degenerate),
+            'parallax_recoveries': int(self.recovered)
+        }
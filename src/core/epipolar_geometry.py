@@ -1,4 +1,5 @@
 import numpy as np
+from .residuals import symmetric_epipolar_distances
 
 def compute_epipoles(F):
     U, S, Vt = np.linalg.svd(F)
@@ -25,18 +26,5 @@ def point_to_line_distance(point, line):
     return np.abs(a*x + b*y + c) / np.sqrt(a**2 + b**2)
 
 def compute_symmetric_epipolar_distance(F, pts_left, pts_right):
-    distances = []
-    for i in range(len(pts_left)):
-        x = np.array([pts_left[i, 0], pts_left[i, 1], 1])
-        xp = np.array([pts_right[i, 0], pts_right[i, 1], 1])
-
-        line_right = F @ x
-        d1 = point_to_line_distance(pts_right[i], line_right)
-
-        line_left = F.T @ xp
-        d2 = point_to_line_distance(pts_left[i], line_left)
-
-        distances.append((d1**2 + d2**2) / 2)
-
-    distances = np.array(distances)
+    distances = symmetric_epipolar_distances(F, pts_left, pts_right)
     return np.mean(distances), np.median(distances), np.std(distances), np.max(distances)
@@ -0,0 +1,141 @@
+import numpy as np
+from .fundamental_matrix import build_design_matrix
+
+def _monomials(degree, n_vars):
+    if n_vars == 0:
+        return [()]
+    return [(i,) + rest for i in range(degree, -1, -1)
+            for rest in _monomials(degree - i, n_vars - 1)]
+
+def _product_tensor(left_degree, right_degree, n_vars=3):
+    left, right = _monomials(left_degree, n_vars), _monomials(right_degree, n_vars)
+    result = _monomials(left_degree + right_degree, n_vars)
+    tensor = np.zeros((len(left) * len(right), len(result)))
+    for a, p in enumerate(left):
+        for b, q in enumerate(right):
+            tensor[a * len(right) + b, result.index(tuple(np.add(p, q)))] = 1
+    return tensor
+
+def _hidden_z_layout():
+    columns = _monomials(3, 2)
+    layout = np.zeros((4, len(_monomials(3, 3)), len(columns)))
+    for m, (x, y, z) in enumerate(_monomials(3, 3)):
+        layout[z, m, columns.index((x, y))] = 1
+    return columns, layout
+
+PRODUCT_11 = _product_tensor(1, 1)
+PRODUCT_21 = _product_tensor(2, 1)
+COLUMNS, HIDDEN_Z_LAYOUT = _hidden_z_layout()
+X_COLUMN, Y_COLUMN, ONE_COLUMN = COLUMNS.index((1, 0)), COLUMNS.index((0, 1)), COLUMNS.index((0, 0))
+N_EVALUATIONS = 16
+
+def _mul(tensor, p, q):
+    outer = p[..., :, None] * q[..., None, :]
+    return outer.reshape(*outer.shape[:-2], -1) @ tensor
+
+def constraint_coefficients(basis):
+    E = np.moveaxis(basis, 1, -1)
+
+    EEt = _mul(PRODUCT_11, E[..., :, None, :, :], E[..., None, :, :, :]).sum(axis=-2)
+    EEtE = _mul(PRODUCT_21, EEt[..., :, :, None, :], E[..., None, :, :, :]).sum(axis=-3)
+    trace = EEt[..., 0, 0, :] + EEt[..., 1, 1, :] + EEt[..., 2, 2, :]
+    trace_E = _mul(PRODUCT_21, trace[..., None, None, :], E)
+
+    minors = (_mul(PRODUCT_11, E[..., 1, 1, :], E[..., 2, 2, :]) -
+              _mul(PRODUCT_11, E[..., 1, 2, :], E[..., 2, 1, :]),
+              _mul(PRODUCT_11, E[..., 1, 2, :], E[..., 2, 0, :]) -
+              _mul(PRODUCT_11, E[..., 1, 0, :], E[..., 2, 2, :]),
+              _mul(PRODUCT_11, E[..., 1, 0, :], E[..., 2, 1, :]) -
+              _mul(PRODUCT_11, E[..., 1, 1, :], E[..., 2, 0, :]))
+    det = sum(_mul(PRODUCT_21, minor, E[..., 0, j, :]) for j, minor in enumerate(minors))
+
+    trace_constraint = (2 * EEtE - trace_E).reshape(len(basis), 9, -1)
+    coefficients = np.concatenate([det[:, None, :], trace_constraint], axis=1)
+    return np.einsum('bem,kmc->bkec', coefficients, HIDDEN_Z_LAYOUT)
+
+def evaluate_hidden(coefficients, z):
+    powers = z[..., None] ** np.arange(4)
+    return np.einsum('b...k,bkec->b...ec', powers, coefficients)
+
+def estimate_essential_5point_batch(samples_left, samples_right):
+    A = build_design_matrix(samples_left, samples_right)
+    U, S, Vt = np.linalg.svd(A, full_matrices=True)
+    basis = Vt[..., 5:, :].reshape(-1, 4, 3, 3)
+
+    coefficients = constraint_coefficients(basis)
+    roots_of_unity = np.exp(2j * np.pi * np.arange(N_EVALUATIONS) / N_EVALUATIONS)
+    values = np.linalg.det(evaluate_hidden(coefficients, np.broadcast_to(
+        roots_of_unity, (len(basis), N_EVALUATIONS))))
+    coeffs = (np.fft.fft(values, axis=1) / N_EVALUATIONS)[:, 10::-1].real
+
+    leading = coeffs[:, 0]
+    valid = np.abs(leading) > 1e-12 * np.max(np.abs(coeffs), axis=1)
+    companion = np.zeros((len(coeffs), 10, 10))
+    companion[valid, 0, :] = -coeffs[valid, 1:] / leading[valid, None]
+    companion[:, np.arange(1, 10), np.arange(9)] = 1
+    roots = np.linalg.eigvals(companion)
+
+    real = (np.abs(roots.imag) < 1e-8 * np.maximum(1, np.abs(roots.real))) & valid[:, None]
+    sample_idx, root_idx = np.nonzero(real)
+    z = roots.real[sample_idx, root_idx]
+    if len(z) == 0:
+        return np.zeros((0, 3, 3)), sample_idx
+
+    M = evaluate_hidden(coefficients[sample_idx], z)
+    v = np.linalg.svd(M)[2][:, -1, :]
+    solvable = np.abs(v[:, ONE_COLUMN]) > 1e-12
+    x = v[solvable, X_COLUMN] / v[solvable, ONE_COLUMN]
+    y = v[solvable, Y_COLUMN] / v[solvable, ONE_COLUMN]
+    B = basis[sample_idx[solvable]]
+    E = (x[:, None, None] * B[:, 0] + y[:, None, None] * B[:, 1] +
+         z[solvable, None, None] * B[:, 2] + B[:, 3])
+    return E / np.linalg.norm(E, axis=(1, 2))[:, None, None], sample_idx[solvable]
+
+def estimate_essential_5point(norm_left, norm_right):
+    E, _ = estimate_essential_5point_batch(norm_left[None], norm_right[None])
+    return E
+
+def project_essential(E):
+    U, S, Vt = np.linalg.svd(E)
+    S = np.zeros_like(S)
+    S[..., :2] = 1
+    return (U * S[..., None, :]) @ Vt
+
+def calibrate_points(points, K):
+    points = np.asarray(points, dtype=np.float64)
+    return (points - K[:2, 2]) @ np.linalg.inv(K[:2, :2]).T
+
+def fundamental_from_essential(E, K_left, K_right):
+    return np.linalg.inv(K_right).T @ E @ np.linalg.inv(K_left)
+
+def essential_from_fundamental(F, K_left, K_right):
+    return K_right.T @ F @ K_left
+
+def triangulate(R, t, norm_left, norm_right):
+    P_left = np.hstack([np.eye(3), np.zeros((3, 1))])
+    P_right = np.hstack([R, t.reshape(3, 1)])
+    A = np.stack([norm_left[:, :1] * P_left[2] - P_left[0],
+                  norm_left[:, 1:] * P_left[2] - P_left[1],
+                  norm_right[:, :1] * P_right[2] - P_right[0],
+                  norm_right[:, 1:] * P_right[2] - P_right[1]], axis=1)
+    X = np.linalg.svd(A)[2][:, -1, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return X[:, :3] / X[:, 3:]
+
+def recover_pose(E, norm_left, norm_right):
+    U, _, Vt = np.linalg.svd(E)
+    if np.linalg.det(U) < 0:
+        U = -U
+    if np.linalg.det(Vt) < 0:
+        Vt = -Vt
+    W = np.array([[0, -1, 0], [1, 0, 0], [0, 0, 1.0]])
+    t = U[:, 2]
+
+    best = None
+    for R in (U @ W @ Vt, U @ W.T @ Vt):
+        for sign in (1, -1):
+            X = triangulate(R, sign * t, norm_left, norm_right)
+            in_front = (X[:, 2] > 0) & ((X @ R.T + sign * t)[:, 2] > 0)
+            if best is None or np.sum(in_front) > np.sum(best[2]):
+                best = (R, sign * t, in_front)
+    return best
@@ -13,26 +13,86 @@ def normalize_points(points):
     normalized = scale * shifted
     return T, normalized
 
+def build_design_matrix(pts_left, pts_right):
+    x, y = pts_left[..., 0], pts_left[..., 1]
+    xp, yp = pts_right[..., 0], pts_right[..., 1]
+    return np.stack([xp*x, xp*y, xp, yp*x, yp*y, yp, x, y, np.ones_like(x)], axis=-1)
+
+def enforce_rank2(F):
+    U, S, Vt = np.linalg.svd(F)
+    S[..., 2] = 0
+    return (U * S[..., None, :]) @ Vt
+
 def estimate_fundamental_8point(pts_left, pts_right):
     T_left, pts_left_norm = normalize_points(pts_left)
     T_right, pts_right_norm = normalize_points(pts_right)
 
-    n = pts_left.shape[0]
-    A = np.zeros((n, 9))
-    for i in range(n):
-        x, y = pts_left_norm[i]
-        xp, yp = pts_right_norm[i]
-        A[i] = [xp*x, xp*y, xp, yp*x, yp*y, yp, x, y, 1]
+    A = build_design_matrix(pts_left_norm, pts_right_norm)
 
-    U, S, Vt = np.linalg.svd(A)
+    U, S, Vt = np.linalg.svd(A, full_matrices=A.shape[0] < 9)
     F_norm = Vt[-1].reshape(3, 3)
 
-    U_f, S_f, Vt_f = np.linalg.svd(F_norm)
-    S_f[2] = 0
-    F_norm = U_f @ np.diag(S_f) @ Vt_f
+    F_norm = enforce_rank2(F_norm)
 
     F = T_right.T @ F_norm @ T_left
 
     F = F / F[2, 2]
 
     return F
+
+def estimate_fundamental_8point_batch(samples_left, samples_right):
+    A = build_design_matrix(samples_left, samples_right)
+    U, S, Vt = np.linalg.svd(A)
+    F_norm = Vt[..., -1, :].reshape(-1, 3, 3)
+    return enforce_rank2(F_norm)
+
+def estimate_fundamental_7point_batch(samples_left, samples_right):
+    A = build_design_matrix(samples_left, samples_right)
+    U, S, Vt = np.linalg.svd(A)
+    F1 = Vt[..., -1, :].reshape(-1, 3, 3)
+    F2 = Vt[..., -2, :].reshape(-1, 3, 3)
+
+    alphas = np.array([0.0, 1.0, -1.0, 2.0])
+    dets = np.linalg.det(F2[:, None] + alphas[None, :, None, None] * (F1 - F2)[:, None])
+    coeffs = dets @ np.linalg.inv(np.vander(alphas, 4)).T
+
+    leading = coeffs[:, 0]
+    valid = np.abs(leading) > 1e-12 * np.max(np.abs(coeffs), axis=1)
+    monic = np.zeros((len(coeffs), 3))
+    monic[valid] = coeffs[valid, 1:] / leading[valid, None]
+
+    companion = np.zeros((len(coeffs), 3, 3))
+    companion[:, 0, :] = -monic
+    companion[:, 1, 0] = 1
+    companion[:, 2, 1] = 1
+    roots = np.linalg.eigvals(companion)
+
+    real = (np.abs(roots.imag) < 1e-10) & valid[:, None]
+    sample_idx, root_idx = np.nonzero(real)
+    alpha = roots.real[sample_idx, root_idx][:, None, None]
+    F_norm = alpha * F1[sample_idx] + (1 - alpha) * F2[sample_idx]
+    return F_norm, sample_idx
+
+def estimate_fundamental_7point(pts_left, pts_right):
+    T_left, pts_left_norm = normalize_points(pts_left)
+    T_right, pts_right_norm = normalize_points(pts_right)
+
+    F_norm, _ = estimate_fundamental_7point_batch(pts_left_norm[None], pts_right_norm[None])
+
+    F = T_right.T @ F_norm @ T_left
+    F = F / F[:, 2:3, 2:3]
+
+    return F
+
+def estimate_fundamental_weighted(pts_left, pts_right, weights):
+    T_left, pts_left_norm = normalize_points(pts_left)
+    T_right, pts_right_norm = normalize_points(pts_right)
+
+    A = build_design_matrix(pts_left_norm, pts_right_norm) * weights[:, None]
+
+    U, S, Vt = np.linalg.svd(A, full_matrices=A.shape[0] < 9)
+    F_norm = enforce_rank2(Vt[-1].reshape(3, 3))
+
+    F = T_right.T @ F_norm @ T_left
+
+    return F / F[2, 2]
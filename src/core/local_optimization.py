@@ -0,0 +1,93 @@
+import time
+import numpy as np
+from .fundamental_matrix import estimate_fundamental_8point, estimate_fundamental_weighted
+from .residuals import epipolar_lines
+
+class LocalOptimizer:
+    def __init__(self, threshold, distance_fn, rng, inner_iters=10, inner_sample_size=56,
+                 irls_iters=4, threshold_multiplier=3.0, min_improvement=0.1):
+        self.threshold = threshold
+        self.rng = rng
+        self.distance_fn = distance_fn
+        self.inner_iters = inner_iters
+        self.inner_sample_size = inner_sample_size
+        self.irls_iters = irls_iters
+        self.threshold_multiplier = threshold_multiplier
+        self.min_improvement = min_improvement
+
+        self.runs = 0
+        self.elapsed = 0.0
+        self.inlier_gain = 0
+        self.iterations_saved = 0
+        self.last_count = 0
+
+    def should_run(self, inlier_count):
+        return inlier_count >= 8 and inlier_count > self.last_count * (1 + self.min_improvement)
+
+    def score(self, F, hom_left, hom_right):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inlier_mask = self.distance_fn(F, hom_left, hom_right) < self.threshold
+        return inlier_mask, np.sum(inlier_mask)
+
+    def expired(self, deadline):
+        return deadline is not None and time.perf_counter() >= deadline
+
+    def irls(self, F, hom_left, hom_right, deadline=None):
+        best_F, best_mask, best_count = F, *self.score(F, hom_left, hom_right)
+        thresholds = np.linspace(self.threshold_multiplier * self.threshold, self.threshold,
+                                 self.irls_iters)
+
+        for threshold in thresholds:
+            if self.expired(deadline):
+                break
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mask = self.distance_fn(F, hom_left, hom_right) < threshold
+            if np.sum(mask) < 8:
+                break
+
+            _, _, lines_right, lines_left = epipolar_lines(F, hom_left[mask], hom_right[mask])
+            gradient = np.sqrt(lines_right[0]**2 + lines_right[1]**2 +
+                               lines_left[0]**2 + lines_left[1]**2)
+            weights = 1 / np.maximum(gradient, 1e-12)
+            F = estimate_fundamental_weighted(hom_left[mask, :2], hom_right[mask, :2],
+                                              weights / np.max(weights))
+
+            inlier_mask, inlier_count = self.score(F, hom_left, hom_right)
+            if inlier_count > best_count:
+                best_F, best_mask, best_count = F, inlier_mask, inlier_count
+
+        return best_F, best_mask, best_count
+
+    def optimize(self, F, inlier_mask, hom_left, hom_right, deadline=None):
+        start = time.perf_counter()
+        initial_count = np.sum(inlier_mask)
+        best_F, best_mask, best_count = self.irls(F, hom_left, hom_right, deadline)
+
+        for _ in range(self.inner_iters):
+            if self.expired(deadline):
+                break
+            inliers = np.flatnonzero(best_mask)
+            if len(inliers) <= self.inner_sample_size:
+                break
+            sample = self.rng.choice(inliers, self.inner_sample_size, replace=False)
+            try:
+                F_inner = estimate_fundamental_8point(hom_left[sample, :2], hom_right[sample, :2])
+                F_inner, mask, count = self.irls(F_inner, hom_left, hom_right, deadline)
+            except np.linalg.LinAlgError:
+                continue
+            if count > best_count:
+                best_F, best_mask, best_count = F_inner, mask, count
+
+        self.runs += 1
+        self.elapsed += time.perf_counter() - start
+        self.inlier_gain += int(max(best_count - initial_count, 0))
+        self.last_count = max(best_count, initial_count)
+        return best_F, best_mask, best_count
+
+    def get_statistics(self):
+        return {
+            'lo_runs': int(self.runs),
+            'lo_time_ms': float(1e3 * self.elapsed),
+            'lo_inlier_gain': int(self.inlier_gain),
+            'lo_iterations_saved': int(self.iterations_saved)
+        }
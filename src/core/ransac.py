@@ -1,79 +1,447 @@
+import time
 import numpy as np
-from .fundamental_matrix import estimate_fundamental_8point
-from .epipolar_geometry import point_to_line_distance
+from concurrent.futures import ThreadPoolExecutor
+from .fundamental_matrix import (normalize_points, estimate_fundamental_8point,
+                                 estimate_fundamental_8point_batch, estimate_fundamental_7point,
+                                 estimate_fundamental_7point_batch)
+from .essential_matrix import (estimate_essential_5point, estimate_essential_5point_batch,
+                               project_essential, calibrate_points,
+                               fundamental_from_essential, essential_from_fundamental, recover_pose)
+from .residuals import as_homogeneous, average_epipolar_distances
+from .sprt import SPRTVerifier, sprt_max_iterations, sprt_statistics
+from .sampling import UniformSampler, ProsacSampler
+from .local_optimization import LocalOptimizer
+from .refinement import SampsonRefiner
+from .degeneracy import DegeneracyChecker
+from ..utils.profiling import span, count
+
+SAMPLE_SIZES = {'8point': 8, '7point': 7, '5point': 5}
+MODELS_PER_SAMPLE = {'8point': 1.0, '7point': 2.0, '5point': 4.0}
+VERIFICATION_MODES = ('full', 'sprt')
+SAMPLERS = ('uniform', 'prosac')
+BUDGET_PROBE_SIZE = 8
+
+class RansacWorker:
+    def __init__(self, rng, sampler, verifier, hom_left, hom_right):
+        self.rng = rng
+        self.sampler = sampler
+        self.verifier = verifier
+        if verifier is not None:
+            self.perm_left, self.perm_right = verifier.prepare(hom_left, hom_right)
 
 class FundamentalMatrixRANSAC:
-    def __init__(self, max_iters=2000, threshold=1.5, confidence=0.99):
+    def __init__(self, max_iters=2000, threshold=1.5, confidence=0.99, batch_size=None,
+                 solver='8point', verification='full', sampler='uniform',
+                 local_optimization=False, n_workers=1, seed=None, round_size=32, K_left=None,
+                 K_right=None, refine=False, degeneracy_check=False, time_budget_ms=None,
+                 progress=None):
+        if solver not in SAMPLE_SIZES:
+            raise ValueError(f"Unsupported solver: {solver}")
+        if solver == '5point' and K_left is None:
+            raise ValueError("The 5-point solver requires camera intrinsics")
+        if solver == '5point' and degeneracy_check:
+            raise ValueError("The degeneracy check applies to the uncalibrated solvers only")
+        if verification not in VERIFICATION_MODES:
+            raise ValueError(f"Unsupported verification: {verification}")
+        if sampler not in SAMPLERS:
+            raise ValueError(f"Unsupported sampler: {sampler}")
+        if time_budget_ms is not None and time_budget_ms <= 0:
+            raise ValueError("time_budget_ms must be positive")
         self.max_iters = max_iters
         self.threshold = threshold
         self.confidence = confidence
+        self.batch_size = batch_size
+        self.solver = solver
+        self.sample_size = SAMPLE_SIZES[solver]
+        self.verification = verification
+        self.sampler_name = sampler
+        self.local_optimization = local_optimization
+        self.n_workers = n_workers
+        self.seed = seed
+        self.round_size = round_size
+        self.refine = refine
+        self.refiner = None
+        self.degeneracy_check = degeneracy_check
+        self.degeneracy_checker = None
+        self.time_budget_ms = time_budget_ms
+        self.progress = progress
+        self.deadline = None
+        self.budget_exhausted = False
+        self.sample_cost = None
+        self.elapsed = 0.0
+        self.K_left = None if K_left is None else np.asarray(K_left, dtype=np.float64)
+        self.K_right = self.K_left if K_right is None else np.asarray(K_right, dtype=np.float64)
+        self.calibrated = self.K_left is not None
+        self.best_E = None
+        self.R = None
+        self.t = None
+        self.pose_mask = None
+        self.workers = []
+        self.local_optimizer = None
         self.best_F = None
         self.best_inliers = None
         self.best_inlier_count = 0
         self.actual_iters = 0
 
     def compute_epipolar_distance(self, F, pts_left, pts_right):
-        distances = []
-        for i in range(len(pts_left)):
-            x = np.array([pts_left[i, 0], pts_left[i, 1], 1])
-            xp = np.array([pts_right[i, 0], pts_right[i, 1], 1])
+        return average_epipolar_distances(F, pts_left, pts_right)
+
+    def compute_max_iterations(self, inlier_count, n_points):
+        inlier_ratio = inlier_count / n_points
+        verifiers = [worker.verifier for worker in self.workers if worker.verifier is not None]
+        if verifiers:
+            return sprt_max_iterations(verifiers, inlier_ratio, self.sample_size,
+                                       self.confidence, self.max_iters)
+        if inlier_ratio > 0:
+            num = np.log(1 - self.confidence)
+            denom = np.log(1 - inlier_ratio**self.sample_size)
+            if denom < 0:
+                return min(int(num / denom), self.max_iters)
+        return self.max_iters
+
+    def achieved_confidence(self, inlier_count, n_points, iterations):
+        if n_points == 0 or iterations == 0:
+            return 0.0
+        p_good = (inlier_count / n_points) ** self.sample_size
+        if p_good >= 1:
+            return 1.0
+        return float(-np.expm1(iterations * np.log1p(-p_good)))
+
+    def deadline_reached(self):
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.budget_exhausted = True
+        return self.budget_exhausted
+
+    def budget_batch(self, batch):
+        if self.deadline is None:
+            return batch
+        if self.sample_cost is None:
+            return min(batch, BUDGET_PROBE_SIZE)
+        remaining = self.deadline - time.perf_counter()
+        return int(max(1, min(batch, 0.5 * remaining / self.sample_cost)))
+
+    def record_cost(self, start, batch):
+        if self.deadline is not None:
+            self.sample_cost = (time.perf_counter() - start) / batch
+
+    def normalize(self, pts_left, pts_right):
+        if self.solver == '5point':
+            return (np.linalg.inv(self.K_left), calibrate_points(pts_left, self.K_left),
+                    np.linalg.inv(self.K_right), calibrate_points(pts_right, self.K_right))
+        T_left, norm_left = normalize_points(pts_left)
+        T_right, norm_right = normalize_points(pts_right)
+        return T_left, norm_left, T_right, norm_right
+
+    def solve_minimal(self, sample_left, sample_right):
+        if self.solver == '5point':
+            E = estimate_essential_5point(calibrate_points(sample_left, self.K_left),
+                                          calibrate_points(sample_right, self.K_right))
+            return fundamental_from_essential(E, self.K_left, self.K_right)
+        if self.solver == '7point':
+            return estimate_fundamental_7point(sample_left, sample_right)
+        return estimate_fundamental_8point(sample_left, sample_right)[None]
+
+    def solve_minimal_batch(self, samples_left, samples_right):
+        if self.solver == '5point':
+            return estimate_essential_5point_batch(samples_left, samples_right)
+        if self.solver == '7point':
+            return estimate_fundamental_7point_batch(samples_left, samples_right)
+        return (estimate_fundamental_8point_batch(samples_left, samples_right),
+                np.arange(len(samples_left)))
+
+    def score_candidates(self, candidates, hom_left, hom_right, worker):
+        if len(candidates) == 0:
+            return None, 0, None
+
+        if worker.verifier is None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                distances = self.compute_epipolar_distance(candidates, hom_left, hom_right)
+            inlier_masks = distances < self.threshold
+            inlier_counts = np.sum(inlier_masks, axis=1)
+            best = np.argmax(inlier_counts)
+            return best, inlier_counts[best], inlier_masks[best]
 
-            line_right = F @ x
-            d1 = point_to_line_distance(pts_right[i], line_right)
+        best, best_count, best_mask = None, 0, None
+        for i, F in enumerate(candidates):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                inlier_mask = worker.verifier.verify(F, worker.perm_left, worker.perm_right,
+                                                     self.compute_epipolar_distance, self.threshold)
+            if inlier_mask is None:
+                continue
+            inlier_count = np.sum(inlier_mask)
+            if inlier_count > best_count:
+                best, best_count, best_mask = i, inlier_count, inlier_mask
+        return best, best_count, best_mask
+
+    def update_best(self, F, inlier_count, inlier_mask, n_points, sample=None):
+        if self.degeneracy_checker is not None and sample is not None:
+            with span('ransac.degeneracy'):
+                F, inlier_count, inlier_mask = self.degeneracy_checker.check(
+                    F, inlier_count, inlier_mask, self._hom_left[sample, :2],
+                    self._hom_right[sample, :2], self._hom_left, self._hom_right)
+
+        if (self.local_optimizer is not None and self.local_optimizer.should_run(inlier_count)
+                and not self.deadline_reached()):
+            bound_before = self.compute_max_iterations(inlier_count, n_points)
+            with span('ransac.local_optimization'):
+                F_lo, mask_lo, count_lo = self.local_optimizer.optimize(
+                    F, inlier_mask, self._hom_left, self._hom_right, self.deadline)
+            if count_lo > inlier_count:
+                F, inlier_mask, inlier_count = F_lo, mask_lo, count_lo
+                bound_after = self.compute_max_iterations(inlier_count, n_points)
+                self.local_optimizer.iterations_saved += max(bound_before - bound_after, 0)
 
-            line_left = F.T @ xp
-            d2 = point_to_line_distance(pts_left[i], line_left)
+        count('ransac.best_updates')
+        self.best_inlier_count = inlier_count
+        self.best_inliers = inlier_mask
+        self.best_F = F / F[2, 2]
+        if self.progress is not None:
+            self.progress(self.best_F, self.best_inliers)
+        for worker in self.workers:
+            if worker.verifier is not None:
+                worker.verifier.update_epsilon(inlier_count)
+        max_iters = self.compute_max_iterations(inlier_count, n_points)
+        for worker in self.workers:
+            max_iters = worker.sampler.compute_max_iterations(inlier_mask, self.confidence, max_iters)
+        return max_iters
 
-            distances.append((d1 + d2) / 2)
+    def verify_initial(self, F, hom_left, hom_right, min_inliers=None):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inlier_mask = self.compute_epipolar_distance(F, hom_left, hom_right) < self.threshold
+        inlier_count = np.sum(inlier_mask)
+        self.initial_inlier_count = int(inlier_count)
+        if inlier_count < 8:
+            return False
 
-        return np.array(distances)
+        self.adaptive_max_iters = self.update_best(F, inlier_count, inlier_mask, len(hom_left))
+        return bool(min_inliers is not None and self.best_inlier_count >= min_inliers)
 
-    def fit(self, pts_left, pts_right):
+    def create_worker(self, rng, n_points, scores, hom_left, hom_right, index=0):
+        if self.sampler_name == 'prosac':
+            sampler = ProsacSampler(scores, self.sample_size, rng, offset=index,
+                                    stride=self.n_workers)
+        else:
+            sampler = UniformSampler(n_points, self.sample_size, rng)
+        verifier = None
+        if self.verification == 'sprt':
+            verifier = SPRTVerifier(n_points, rng, models_per_sample=MODELS_PER_SAMPLE[self.solver])
+        return RansacWorker(rng, sampler, verifier, hom_left, hom_right)
+
+    def fit(self, pts_left, pts_right, scores=None, initial_F=None, min_initial_inliers=None):
         n_points = len(pts_left)
-        best_inlier_mask = np.zeros(n_points, dtype=bool)
+        hom_left = as_homogeneous(pts_left)
+        hom_right = as_homogeneous(pts_right)
+        if self.sampler_name == 'prosac' and scores is None:
+            raise ValueError("PROSAC sampling requires match scores")
+
+        self.best_F = None
+        self.best_inliers = None
+        self.best_inlier_count = 0
+        self.initial_inlier_count = None
+        self.initial_accepted = False
+        self.best_E, self.R, self.t, self.pose_mask = None, None, None, None
+        self.adaptive_max_iters = self.max_iters
+        self.actual_iters = 0
+        self._hom_left, self._hom_right = hom_left, hom_right
+        start = time.perf_counter()
+        self.budget_exhausted = False
+        self.sample_cost = None
+        self.deadline = None
+        if self.time_budget_ms is not None:
+            self.deadline = start + self.time_budget_ms / 1e3
+
+        seed_sequence = np.random.SeedSequence(self.seed)
+        rng = np.random.default_rng(seed_sequence)
+        self.local_optimizer = None
+        self.refiner = None
+        self.degeneracy_checker = None
+        if self.degeneracy_check:
+            self.degeneracy_checker = DegeneracyChecker(self.threshold, self.compute_epipolar_distance,
+                                                        rng)
+        if self.local_optimization:
+            self.local_optimizer = LocalOptimizer(self.threshold, self.compute_epipolar_distance, rng)
+
+        if self.n_workers > 1:
+            self.workers = [self.create_worker(np.random.default_rng(child), n_points, scores,
+                                               hom_left, hom_right, index)
+                            for index, child in enumerate(seed_sequence.spawn(self.n_workers))]
+        else:
+            self.workers = [self.create_worker(rng, n_points, scores, hom_left, hom_right)]
+
+        if initial_F is not None:
+            with span('ransac.initial_model'):
+                self.initial_accepted = self.verify_initial(initial_F, hom_left, hom_right,
+                                                            min_initial_inliers)
 
-        adaptive_max_iters = self.max_iters
+        if not self.initial_accepted:
+            with span('ransac.sample_consensus'):
+                if self.n_workers > 1:
+                    self._fit_parallel(pts_left, pts_right, hom_left, hom_right)
+                elif self.batch_size:
+                    self._fit_batched(pts_left, pts_right, hom_left, hom_right)
+                else:
+                    self._fit_sequential(pts_left, pts_right, hom_left, hom_right)
+        self.elapsed = time.perf_counter() - start
+
+        with span('ransac.refit'):
+            if (self.best_inlier_count >= 8 and self.local_optimizer is not None
+                    and not self.deadline_reached()):
+                self.best_F, self.best_inliers, self.best_inlier_count = self.local_optimizer.optimize(
+                    self.best_F, self.best_inliers, hom_left, hom_right, self.deadline)
+            elif self.best_inlier_count >= 8:
+                inlier_left = pts_left[self.best_inliers]
+                inlier_right = pts_right[self.best_inliers]
+                self.best_F = estimate_fundamental_8point(inlier_left, inlier_right)
+        if self.refine and not self.calibrated and self.best_inlier_count >= 8:
+            with span('ransac.refine'):
+                self.refine_model(pts_left, pts_right, hom_left, hom_right)
+        if self.calibrated and self.best_F is not None:
+            with span('ransac.pose'):
+                self.recover_pose(pts_left, pts_right, hom_left, hom_right)
+        count('ransac.iterations', self.actual_iters)
+
+        return self.best_F, self.best_inliers
+
+    def rescore_best(self, hom_left, hom_right):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.best_inliers = self.compute_epipolar_distance(self.best_F, hom_left,
+                                                               hom_right) < self.threshold
+        self.best_inlier_count = int(np.sum(self.best_inliers))
+
+    def refine_model(self, pts_left, pts_right, hom_left, hom_right):
+        self.refiner = SampsonRefiner()
+        self.best_F = self.refiner.refine(self.best_F, pts_left[self.best_inliers],
+                                          pts_right[self.best_inliers])
+        self.rescore_best(hom_left, hom_right)
+
+    def recover_pose(self, pts_left, pts_right, hom_left, hom_right):
+        F = fundamental_from_essential(
+            project_essential(essential_from_fundamental(self.best_F, self.K_left, self.K_right)),
+            self.K_left, self.K_right)
+        if self.refine and self.best_inlier_count >= 8:
+            self.refiner = SampsonRefiner()
+            with span('ransac.refine'):
+                F = self.refiner.refine(F, pts_left[self.best_inliers], pts_right[self.best_inliers],
+                                        self.K_left, self.K_right)
+        E = essential_from_fundamental(F, self.K_left, self.K_right)
+        self.best_E = E / np.linalg.norm(E) * np.sqrt(2)
+        self.best_F = F / F[2, 2]
+        self.rescore_best(hom_left, hom_right)
+        inlier_left, inlier_right = pts_left[self.best_inliers], pts_right[self.best_inliers]
+        self.R, self.t, self.pose_mask = recover_pose(
+            self.best_E, calibrate_points(inlier_left, self.K_left),
+            calibrate_points(inlier_right, self.K_right))
+
+    def _fit_sequential(self, pts_left, pts_right, hom_left, hom_right):
+        n_points = len(pts_left)
+        worker = self.workers[0]
+        adaptive_max_iters = self.adaptive_max_iters
+        iteration = -1
 
         for iteration in range(self.max_iters):
-            indices = np.random.choice(n_points, 8, replace=False)
+            indices = worker.sampler.draw()
             sample_left = pts_left[indices]
             sample_right = pts_right[indices]
+            if worker.verifier is not None:
+                worker.verifier.record_samples()
 
             try:
-                F_candidate = estimate_fundamental_8point(sample_left, sample_right)
-
-                distances = self.compute_epipolar_distance(F_candidate, pts_left, pts_right)
-                inlier_mask = distances < self.threshold
-                inlier_count = np.sum(inlier_mask)
-
-                if inlier_count > self.best_inlier_count:
-                    self.best_inlier_count = inlier_count
-                    self.best_inliers = inlier_mask
-                    self.best_F = F_candidate
-
-                    inlier_ratio = inlier_count / n_points
-                    if inlier_ratio > 0:
-                        num = np.log(1 - self.confidence)
-                        denom = np.log(1 - inlier_ratio**8)
-                        if denom < 0:
-                            adaptive_max_iters = int(num / denom)
-                            adaptive_max_iters = min(adaptive_max_iters, self.max_iters)
-
-                if iteration + 1 >= adaptive_max_iters:
-                    self.actual_iters = iteration + 1
-                    break
-
-            except:
-                continue
+                with span('ransac.generate'):
+                    candidates = self.solve_minimal(sample_left, sample_right)
+            except np.linalg.LinAlgError:
+                candidates = np.zeros((0, 3, 3))
+            count('ransac.hypotheses', len(candidates))
+            with span('ransac.score'):
+                best, inlier_count, inlier_mask = self.score_candidates(candidates, hom_left,
+                                                                        hom_right, worker)
+
+            if inlier_count > self.best_inlier_count:
+                adaptive_max_iters = self.update_best(candidates[best], inlier_count,
+                                                      inlier_mask, n_points, indices)
+
+            if iteration + 1 >= adaptive_max_iters or self.deadline_reached():
+                break
 
         self.actual_iters = iteration + 1
 
-        if self.best_inlier_count >= 8:
-            inlier_left = pts_left[self.best_inliers]
-            inlier_right = pts_right[self.best_inliers]
-            self.best_F = estimate_fundamental_8point(inlier_left, inlier_right)
+    def _fit_batched(self, pts_left, pts_right, hom_left, hom_right):
+        n_points = len(pts_left)
+        worker = self.workers[0]
+        T_left, norm_left, T_right, norm_right = self.normalize(pts_left, pts_right)
+        adaptive_max_iters = self.adaptive_max_iters
+        iteration = 0
+
+        while iteration < adaptive_max_iters and not self.deadline_reached():
+            batch = self.budget_batch(min(self.batch_size, adaptive_max_iters - iteration))
+            step = time.perf_counter()
+            F_batch, samples = self._generate_batch(worker, batch, norm_left, norm_right,
+                                                    T_left, T_right)
+            iteration += batch
 
-        return self.best_F, self.best_inliers
+            with span('ransac.score'):
+                best, inlier_count, inlier_mask = self.score_candidates(F_batch, hom_left,
+                                                                        hom_right, worker)
+            self.record_cost(step, batch)
+            if inlier_count > self.best_inlier_count:
+                adaptive_max_iters = self.update_best(F_batch[best], inlier_count,
+                                                      inlier_mask, n_points, samples[best])
+
+        self.actual_iters = iteration
+
+    def _generate_batch(self, worker, batch, norm_left, norm_right, T_left, T_right):
+        with span('ransac.generate'):
+            indices = worker.sampler.draw_batch(batch)
+            F_norm, owner = self.solve_minimal_batch(norm_left[indices], norm_right[indices])
+            if worker.verifier is not None:
+                worker.verifier.record_samples(batch)
+        count('ransac.hypotheses', len(F_norm))
+        return T_right.T @ F_norm @ T_left, indices[owner]
+
+    def _run_worker(self, worker, iterations, normalized, hom_left, hom_right):
+        norm_left, norm_right, T_left, T_right = normalized
+        best_F, best_count, best_mask, best_sample = None, 0, None, None
+        chunk = self.batch_size or self.round_size
+        done = 0
+
+        while done < iterations and not self.deadline_reached():
+            batch = self.budget_batch(min(chunk, iterations - done))
+            step = time.perf_counter()
+            F_batch, samples = self._generate_batch(worker, batch, norm_left, norm_right,
+                                                    T_left, T_right)
+            done += batch
+            with span('ransac.score'):
+                best, inlier_count, inlier_mask = self.score_candidates(F_batch, hom_left,
+                                                                        hom_right, worker)
+            self.record_cost(step, batch)
+            if inlier_count > best_count:
+                best_F, best_count, best_mask = F_batch[best], inlier_count, inlier_mask
+                best_sample = samples[best]
+
+        return best_F, best_count, best_mask, best_sample, done
+
+    def _fit_parallel(self, pts_left, pts_right, hom_left, hom_right):
+        n_points = len(pts_left)
+        T_left, norm_left, T_right, norm_right = self.normalize(pts_left, pts_right)
+        normalized = (norm_left, norm_right, T_left, T_right)
+        adaptive_max_iters = self.adaptive_max_iters
+        iteration = 0
+
+        with ThreadPoolExecutor(max_workers=self.n_workers) as pool:
+            while iteration < adaptive_max_iters and not self.deadline_reached():
+                remaining = adaptive_max_iters - iteration
+                per_worker = min(self.round_size, -(-remaining // self.n_workers))
+                futures = [pool.submit(self._run_worker, worker, per_worker, normalized,
+                                       hom_left, hom_right)
+                           for worker in self.workers]
+                results = [future.result() for future in futures]
+                iteration += sum(result[-1] for result in results)
+
+                for F, inlier_count, inlier_mask, sample, _ in results:
+                    if inlier_count > self.best_inlier_count:
+                        adaptive_max_iters = self.update_best(F, inlier_count, inlier_mask,
+                                                              n_points, sample)
+
+        self.actual_iters = iteration
 
     def get_statistics(self):
         if self.best_inliers is None:
@@ -83,9 +451,34 @@ class FundamentalMatrixRANSAC:
         total_count = len(self.best_inliers)
         inlier_ratio = inlier_count / total_count
 
-        return {
+        stats = {
             'inlier_count': int(inlier_count),
             'total_count': int(total_count),
             'inlier_ratio': float(inlier_ratio),
-            'actual_iterations': int(self.actual_iters)
+            'actual_iterations': int(self.actual_iters),
+            'consensus_time_ms': float(1e3 * self.elapsed)
         }
+        if not self.initial_accepted:
+            stats['achieved_confidence'] = self.achieved_confidence(self.best_inlier_count,
+                                                                    total_count, self.actual_iters)
+        if self.time_budget_ms is not None:
+            stats['time_budget_ms'] = float(self.time_budget_ms)
+            stats['budget_exhausted'] = bool(self.budget_exhausted)
+        if self.n_workers > 1:
+            stats['n_workers'] = int(self.n_workers)
+        if self.initial_inlier_count is not None:
+            stats['initial_model_inliers'] = self.initial_inlier_count
+            stats['initial_model_accepted'] = bool(self.initial_accepted)
+        if self.pose_mask is not None:
+            stats['cheirality_inliers'] = int(np.sum(self.pose_mask))
+        stats.update(self.workers[0].sampler.get_statistics())
+        if self.local_optimizer is not None:
+            stats.update(self.local_optimizer.get_statistics())
+        if self.refiner is not None:
+            stats.update(self.refiner.get_statistics())
+        if self.degeneracy_checker is not None:
+            stats.update(self.degeneracy_checker.get_statistics())
+        verifiers = [worker.verifier for worker in self.workers if worker.verifier is not None]
+        if verifiers:
+            stats.update(sprt_statistics(verifiers))
+        return stats
@@ -0,0 +1,146 @@
+import time
+import numpy as np
+from .residuals import as_homogeneous
+
+GENERATORS = np.array([[[0, 0, 0], [0, 0, -1], [0, 1, 0]],
+                       [[0, 0, 1], [0, 0, 0], [-1, 0, 0]],
+                       [[0, -1, 0], [1, 0, 0], [0, 0, 0]]], dtype=np.float64)
+
+def rotation_exp(omega):
+    theta = np.linalg.norm(omega)
+    K = np.tensordot(omega, GENERATORS, axes=1)
+    if theta < 1e-12:
+        return np.eye(3) + K
+    return np.eye(3) + np.sin(theta) / theta * K + (1 - np.cos(theta)) / theta**2 * K @ K
+
+def rank2_factors(F):
+    U, S, Vt = np.linalg.svd(F)
+    if np.linalg.det(U) < 0:
+        U = -U
+    if np.linalg.det(Vt) < 0:
+        Vt = -Vt
+    return U, S[1] / S[0], Vt.T
+
+def compose_rank2(U, s, V):
+    return (U * np.array([1.0, s, 0.0])) @ V.T
+
+def rank2_jacobian(U, s, V):
+    D = np.diag([1.0, s, 0.0])
+    blocks = [U @ G @ D @ V.T for G in GENERATORS]
+    blocks += [-U @ D @ G @ V.T for G in GENERATORS]
+    blocks.append(U @ np.diag([0.0, 1.0, 0.0]) @ V.T)
+    return np.stack([block.ravel() for block in blocks], axis=1)
+
+def hartley_transform(x):
+    centroid = x[:2].mean(axis=1)
+    scale = np.sqrt(2) / np.mean(np.hypot(x[0] - centroid[0], x[1] - centroid[1]))
+    return np.array([[scale, 0, -scale * centroid[0]],
+                     [0, scale, -scale * centroid[1]],
+                     [0, 0, 1]])
+
+def sampson_residuals(F, x, xp):
+    lines_right = F @ x
+    lines_left = F.T @ xp
+    e = np.einsum('ij,ij->j', lines_right, xp)
+    g = np.sqrt(np.einsum('ij,ij->j', lines_right[:2], lines_right[:2]) +
+                np.einsum('ij,ij->j', lines_left[:2], lines_left[:2]))
+    return e / g, g, lines_right, lines_left
+
+def sampson_jacobian(residuals, x, xp, P, outer, cross):
+    r, g, lines_right, lines_left = residuals
+    k = r / g**2
+    A = xp / g
+    A[:2] -= k * lines_right[:2]
+    np.multiply(A[:, None], x, out=outer)
+    np.multiply(xp[:, None], -k * lines_left[:2], out=cross)
+    outer[:, :2] += cross
+    return r, P.T @ outer.reshape(9, -1)
+
+class SampsonRefiner:
+    def __init__(self, max_iters=30, tol=1e-6, lambda_init=1e-3, lambda_factor=10.0):
+        self.max_iters = max_iters
+        self.tol = tol
+        self.lambda_init = lambda_init
+        self.lambda_factor = lambda_factor
+        self.iterations = 0
+        self.initial_cost = None
+        self.final_cost = None
+        self.elapsed = 0.0
+
+    def refine(self, F, pts_left, pts_right, K_left=None, K_right=None):
+        start = time.perf_counter()
+        x = np.ascontiguousarray(as_homogeneous(pts_left).T)
+        xp = np.ascontiguousarray(as_homogeneous(pts_right).T)
+        essential = K_left is not None
+        if essential:
+            T_left = np.linalg.inv(K_left)
+            T_right = np.linalg.inv(K_right if K_right is not None else K_left)
+        else:
+            T_left, T_right = hartley_transform(x), hartley_transform(xp)
+        F_norm = np.linalg.inv(T_right).T @ F @ np.linalg.inv(T_left)
+        U, s, V = rank2_factors(F_norm / np.linalg.norm(F_norm))
+        if essential:
+            s = 1.0
+        n_params = 6 if essential else 7
+
+        def to_pixels(U, s, V):
+            return T_right.T @ compose_rank2(U, s, V) @ T_left
+
+        transform = np.einsum('ai,bj->ijab', T_right, T_left).reshape(9, 9)
+        outer = np.empty((3, 3, x.shape[1]))
+        cross = np.empty((3, 2, x.shape[1]))
+
+        def jacobian(U, s, V, residuals):
+            P = transform @ rank2_jacobian(U, s, V)[:, :n_params]
+            return sampson_jacobian(residuals, x, xp, P, outer, cross)
+
+        F = to_pixels(U, s, V)
+        r, J = jacobian(U, s, V, sampson_residuals(F, x, xp))
+        cost = r @ r
+        self.initial_cost = cost
+        damping = self.lambda_init
+        iteration = 0
+
+        for iteration in range(1, self.max_iters + 1):
+            JtJ, Jtr = J @ J.T, J @ r
+            improved = False
+            while damping < 1e12:
+                try:
+                    step = np.linalg.solve(JtJ + damping * np.diag(np.diag(JtJ) + 1e-12), -Jtr)
+                except np.linalg.LinAlgError:
+                    damping *= self.lambda_factor
+                    continue
+                U_new = U @ rotation_exp(step[:3])
+                V_new = V @ rotation_exp(step[3:6])
+                s_new = s + step[6] if not essential else s
+                F_new = to_pixels(U_new, s_new, V_new)
+                residuals = sampson_residuals(F_new, x, xp)
+                cost_new = residuals[0] @ residuals[0]
+                if cost_new < cost:
+                    improved = True
+                    damping = max(damping / self.lambda_factor, 1e-12)
+                    break
+                damping *= self.lambda_factor
+            if not improved:
+                break
+
+            decrease = cost - cost_new
+            U, s, V, F, cost = U_new, s_new, V_new, F_new, cost_new
+            if decrease <= self.tol * cost or np.linalg.norm(step) <= self.tol:
+                break
+            r, J = jacobian(U, s, V, residuals)
+
+        self.iterations = iteration
+        self.final_cost = cost
+        self.elapsed = time.perf_counter() - start
+        return F / F[2, 2]
+
+    def get_statistics(self):
+        if self.initial_cost is None:
+            return {}
+        return {
+            'lm_iterations': int(self.iterations),
+            'lm_initial_cost': float(self.initial_cost),
+            'lm_final_cost': float(self.final_cost),
+            'lm_time_ms': float(1e3 * self.elapsed)
+        }
@@ -0,0 +1,49 @@
+import numpy as np
+
+def as_homogeneous(points):
+    points = np.asarray(points, dtype=np.float64)
+    if points.shape[-1] == 3:
+        return points
+    ones = np.ones(points.shape[:-1] + (1,))
+    return np.concatenate([points, ones], axis=-1)
+
+def _apply(F, x):
+    F = np.asarray(F)
+    return (F.reshape(-1, 3) @ x.T).reshape(F.shape[:-1] + (len(x),))
+
+def epipolar_lines(F, pts_left, pts_right):
+    x = as_homogeneous(pts_left)
+    xp = as_homogeneous(pts_right)
+    lines_right = _apply(F, x)
+    lines_left = _apply(np.swapaxes(F, -1, -2), xp)
+    return x, xp, lines_right, lines_left
+
+def _algebraic(lines_right, xp):
+    return (lines_right[..., 0, :] * xp[:, 0] + lines_right[..., 1, :] * xp[:, 1] +
+            lines_right[..., 2, :] * xp[:, 2])
+
+def algebraic_residuals(F, pts_left, pts_right):
+    xp = as_homogeneous(pts_right)
+    return _algebraic(_apply(F, as_homogeneous(pts_left)), xp)
+
+def epipolar_line_distances(F, pts_left, pts_right):
+    x, xp, lines_right, lines_left = epipolar_lines(F, pts_left, pts_right)
+    r = np.abs(_algebraic(lines_right, xp))
+    d_right = r / np.sqrt(lines_right[..., 0, :]**2 + lines_right[..., 1, :]**2)
+    d_left = r / np.sqrt(lines_left[..., 0, :]**2 + lines_left[..., 1, :]**2)
+    return d_right, d_left
+
+def average_epipolar_distances(F, pts_left, pts_right):
+    d_right, d_left = epipolar_line_distances(F, pts_left, pts_right)
+    return (d_right + d_left) / 2
+
+def symmetric_epipolar_distances(F, pts_left, pts_right):
+    d_right, d_left = epipolar_line_distances(F, pts_left, pts_right)
+    return (d_right**2 + d_left**2) / 2
+
+def sampson_distances(F, pts_left, pts_right):
+    x, xp, lines_right, lines_left = epipolar_lines(F, pts_left, pts_right)
+    r = _algebraic(lines_right, xp)
+    denom = (lines_right[..., 0, :]**2 + lines_right[..., 1, :]**2 +
+             lines_left[..., 0, :]**2 + lines_left[..., 1, :]**2)
+    return r**2 / denom
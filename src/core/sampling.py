@@ -0,0 +1,108 @@
+import numpy as np
+
+class UniformSampler:
+    def __init__(self, n_points, sample_size, rng):
+        self.n_points = n_points
+        self.sample_size = sample_size
+        self.rng = rng
+
+    def draw(self):
+        return self.rng.choice(self.n_points, self.sample_size, replace=False)
+
+    def draw_batch(self, count):
+        n, m = self.n_points, self.sample_size
+        if n < 2 * m:
+            return np.argsort(self.rng.random((count, n)), axis=1)[:, :m]
+
+        samples = self.rng.integers(0, n, size=(count, m))
+        while True:
+            sorted_samples = np.sort(samples, axis=1)
+            repeated = np.any(sorted_samples[:, 1:] == sorted_samples[:, :-1], axis=1)
+            if not np.any(repeated):
+                return samples
+            samples[repeated] = self.rng.integers(0, n, size=(np.sum(repeated), m))
+
+    def termination(self, inlier_mask, confidence, max_iters):
+        return max_iters, None
+
+    def compute_max_iterations(self, inlier_mask, confidence, max_iters):
+        return max_iters
+
+    def get_statistics(self):
+        return {}
+
+class ProsacSampler:
+    def __init__(self, scores, sample_size, rng, max_samples=200000, beta=0.01, psi_quantile=1.645,
+                 min_termination_length=None, offset=0, stride=1):
+        self.order = np.argsort(-np.asarray(scores), kind='stable')
+        self.n_points = len(self.order)
+        self.sample_size = sample_size
+        self.rng = rng
+        self.beta = beta
+        self.psi_quantile = psi_quantile
+        if min_termination_length is None:
+            min_termination_length = 3 * sample_size
+        self.min_termination_length = min(max(min_termination_length, sample_size), self.n_points)
+
+        m = sample_size
+        self.n = m
+        self.n_star = self.n_points
+        self.stride = stride
+        self.t = offset + 1 - stride
+        self.T_n = max_samples * np.prod((m - np.arange(m)) / (self.n_points - np.arange(m)))
+        self.T_n_prime = 1
+
+    def advance(self):
+        m = self.sample_size
+        for _ in range(self.stride):
+            self.t += 1
+            if self.t > self.T_n_prime and self.n < self.n_star:
+                T_next = self.T_n * (self.n + 1) / (self.n + 1 - m)
+                self.T_n_prime += int(np.ceil(T_next - self.T_n))
+                self.T_n = T_next
+                self.n += 1
+
+    def draw(self):
+        m = self.sample_size
+        self.advance()
+
+        if self.T_n_prime < self.t:
+            indices = self.rng.choice(self.n, m, replace=False)
+        else:
+            indices = np.append(self.rng.choice(self.n - 1, m - 1, replace=False), self.n - 1)
+        return self.order[indices]
+
+    def draw_batch(self, count):
+        return np.array([self.draw() for _ in range(count)])
+
+    def termination(self, inlier_mask, confidence, max_iters):
+        m = self.sample_size
+        start = self.min_termination_length
+        inliers_in_top = np.cumsum(inlier_mask[self.order])[start - 1:]
+        n = np.arange(start, self.n_points + 1)
+
+        spread = self.beta * (n - m)
+        min_inliers = m + spread + self.psi_quantile * np.sqrt(spread * (1 - self.beta))
+        non_random = inliers_in_top >= min_inliers
+
+        with np.errstate(divide='ignore'):
+            p_good = (inliers_in_top / n)**m
+            k = np.where(p_good >= 1, 0, np.log(1 - confidence) / np.log1p(-p_good))
+        k[~non_random] = np.inf
+
+        best = np.argmin(k)
+        if not np.isfinite(k[best]):
+            return max_iters, None
+        return int(min(k[best], max_iters)), max(int(n[best]), self.n)
+
+    def compute_max_iterations(self, inlier_mask, confidence, max_iters):
+        max_iters, n_star = self.termination(inlier_mask, confidence, max_iters)
+        if n_star is not None:
+            self.n_star = n_star
+        return max_iters
+
+    def get_statistics(self):
+        return {
+            'prosac_subset_size': int(self.n),
+            'prosac_n_star': int(self.n_star)
+        }
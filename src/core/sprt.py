@@ -0,0 +1,120 @@
+import numpy as np
+
+class SPRTVerifier:
+    def __init__(self, n_points, rng, epsilon=0.1, delta=0.01, model_time=200.0,
+                 models_per_sample=1.0, initial_block=16):
+        self.n_points = n_points
+        self.epsilon = epsilon
+        self.delta = delta
+        self.model_time = model_time
+        self.models_per_sample = models_per_sample
+        self.initial_block = initial_block
+
+        self.order = rng.permutation(n_points)
+        self.tests = []
+        self.tested_models = 0
+        self.rejected_models = 0
+        self.points_evaluated = 0
+        self.rejected_consistency = 0.0
+        self._start_test()
+
+    def _decision_threshold(self):
+        eps, delta = self.epsilon, self.delta
+        C = (1 - delta) * np.log((1 - delta) / (1 - eps)) + delta * np.log(delta / eps)
+        K = self.model_time * C / self.models_per_sample + 1
+        A = K
+        for _ in range(10):
+            A = K + np.log(A)
+        return A
+
+    def _start_test(self):
+        self.A = self._decision_threshold()
+        self.log_A = np.log(self.A)
+        self.log_consistent = np.log(self.delta / self.epsilon)
+        self.log_inconsistent = np.log((1 - self.delta) / (1 - self.epsilon))
+        self.tests.append([self.epsilon, self.delta, self.A, 0])
+
+    def prepare(self, hom_left, hom_right):
+        return hom_left[self.order], hom_right[self.order]
+
+    def record_samples(self, count=1):
+        self.tests[-1][3] += count
+
+    def verify(self, F, perm_left, perm_right, residual_fn, threshold):
+        self.tested_models += 1
+        distances = np.empty(self.n_points)
+        log_lambda = 0.0
+        start = 0
+        block = self.initial_block
+
+        while start < self.n_points:
+            stop = min(start + block, self.n_points)
+            d = residual_fn(F, perm_left[start:stop], perm_right[start:stop])
+            distances[start:stop] = d
+            consistent = d < threshold
+
+            steps = np.where(consistent, self.log_consistent, self.log_inconsistent)
+            trace = log_lambda + np.cumsum(steps)
+            crossed = np.flatnonzero(trace > self.log_A)
+            if len(crossed):
+                evaluated = start + crossed[0] + 1
+                self.points_evaluated += evaluated
+                self._record_rejection(np.sum(distances[:evaluated] < threshold) / evaluated)
+                return None
+
+            log_lambda = trace[-1]
+            start = stop
+            block *= 2
+
+        self.points_evaluated += self.n_points
+        inlier_mask = np.empty(self.n_points, dtype=bool)
+        inlier_mask[self.order] = distances < threshold
+        return inlier_mask
+
+    def _record_rejection(self, consistency):
+        self.rejected_models += 1
+        self.rejected_consistency += consistency
+        estimate = self.rejected_consistency / self.rejected_models
+        if estimate > 0 and abs(estimate - self.delta) / self.delta > 0.05 and estimate < self.epsilon:
+            self.delta = estimate
+            self._start_test()
+
+    def update_epsilon(self, inlier_count):
+        epsilon = min(inlier_count / self.n_points, 0.99)
+        if epsilon > self.delta:
+            self.epsilon = epsilon
+            self._start_test()
+
+    def compute_max_iterations(self, inlier_ratio, sample_size, confidence, max_iters):
+        return sprt_max_iterations([self], inlier_ratio, sample_size, confidence, max_iters)
+
+    def get_statistics(self):
+        return sprt_statistics([self])
+
+def sprt_max_iterations(verifiers, inlier_ratio, sample_size, confidence, max_iters):
+    p_good = inlier_ratio**sample_size
+    done = 0
+    log_eta = 0.0
+    for verifier in verifiers:
+        for _, _, A, samples in verifier.tests:
+            log_eta += samples * np.log1p(-p_good * (1 - 1 / A))
+            done += samples
+
+    A = min(verifier.A for verifier in verifiers)
+    denom = np.log1p(-p_good * (1 - 1 / A))
+    if denom >= 0:
+        return max_iters
+    remaining = (np.log(1 - confidence) - log_eta) / denom
+    return int(min(done + max(remaining, 0), max_iters))
+
+def sprt_statistics(verifiers):
+    tested = sum(verifier.tested_models for verifier in verifiers)
+    points = sum(verifier.points_evaluated for verifier in verifiers)
+    return {
+        'sprt_tested_models': int(tested),
+        'sprt_rejected_models': int(sum(verifier.rejected_models for verifier in verifiers)),
+        'sprt_avg_points_evaluated': float(points / max(tested, 1)),
+        'sprt_tests': sum(len(verifier.tests) for verifier in verifiers),
+        'sprt_epsilon': float(verifiers[0].epsilon),
+        'sprt_delta': float(verifiers[0].delta)
+    }
@@ -0,0 +1,142 @@
+import time
+import numpy as np
+from .fundamental_matrix import estimate_fundamental_8point
+from .residuals import as_homogeneous, symmetric_epipolar_distances
+from .ransac import FundamentalMatrixRANSAC
+from ..utils.profiling import span, count
+
+def threshold_bins(distances, thresholds):
+    with np.errstate(invalid='ignore'):
+        bins = np.searchsorted(thresholds, distances, side='right')
+    bins[np.isnan(distances)] = len(thresholds)
+    return bins
+
+def inlier_counts(distances, thresholds):
+    n_bins = len(thresholds) + 1
+    bins = threshold_bins(distances, thresholds)
+    offsets = np.arange(len(distances))[:, None] * n_bins
+    hist = np.bincount((bins + offsets).ravel(), minlength=len(distances) * n_bins)
+    return np.cumsum(hist.reshape(len(distances), n_bins)[:, :-1], axis=1)
+
+class ThresholdSweepRANSAC(FundamentalMatrixRANSAC):
+    def __init__(self, thresholds, max_iters=2000, confidence=0.99, batch_size=64,
+                 solver='8point', sampler='uniform', seed=None):
+        thresholds = np.asarray(thresholds, dtype=np.float64).ravel()
+        if len(thresholds) == 0 or np.any(thresholds <= 0):
+            raise ValueError("thresholds must be a non-empty list of positive values")
+        if solver == '5point':
+            raise ValueError("Threshold sweeps support the uncalibrated solvers only")
+        self.thresholds = np.unique(thresholds)
+        super().__init__(max_iters=max_iters, threshold=float(self.thresholds[-1]),
+                         confidence=confidence, batch_size=batch_size or 1, solver=solver,
+                         sampler=sampler, seed=seed)
+        self.best_models = None
+        self.best_counts = None
+        self.best_masks = None
+        self.n_stars = None
+        self.hypotheses = 0
+        self.elapsed = 0.0
+
+    def threshold_bound(self, j, distances, n_points):
+        bound = self.compute_max_iterations(self.best_counts[j], n_points)
+        for worker in self.workers:
+            bound, n_star = worker.sampler.termination(distances < self.thresholds[j],
+                                                       self.confidence, bound)
+            if n_star is not None:
+                self.n_stars[j] = n_star
+                worker.sampler.n_star = int(self.n_stars.max())
+        return bound
+
+    def fit(self, pts_left, pts_right, scores=None):
+        n_points = len(pts_left)
+        hom_left = as_homogeneous(pts_left)
+        hom_right = as_homogeneous(pts_right)
+        if self.sampler_name == 'prosac' and scores is None:
+            raise ValueError("PROSAC sampling requires match scores")
+
+        start = time.perf_counter()
+        n_thresholds = len(self.thresholds)
+        self.best_models = np.full((n_thresholds, 3, 3), np.nan)
+        self.best_counts = np.zeros(n_thresholds, dtype=np.int64)
+        self.n_stars = np.full(n_thresholds, n_points, dtype=np.int64)
+        self.hypotheses = 0
+        rng = np.random.default_rng(self.seed)
+        self.workers = [self.create_worker(rng, n_points, scores, hom_left, hom_right)]
+        worker = self.workers[0]
+
+        T_left, norm_left, T_right, norm_right = self.normalize(pts_left, pts_right)
+        bounds = np.full(n_thresholds, self.max_iters, dtype=np.int64)
+        iteration = 0
+
+        with span('sweep.sample_consensus'):
+            while iteration < bounds.max():
+                batch = min(self.batch_size, int(bounds.max()) - iteration)
+                F_batch, _ = self._generate_batch(worker, batch, norm_left, norm_right,
+                                                  T_left, T_right)
+                iteration += batch
+                self.hypotheses += len(F_batch)
+                if len(F_batch) == 0:
+                    continue
+
+                with span('sweep.score'):
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        distances = self.compute_epipolar_distance(F_batch, hom_left, hom_right)
+                    counts = inlier_counts(distances, self.thresholds)
+                best = np.argmax(counts, axis=0)
+                improved = np.flatnonzero(counts[best, np.arange(n_thresholds)] > self.best_counts)
+                if len(improved) == 0:
+                    continue
+
+                count('sweep.best_updates', len(improved))
+                self.best_counts[improved] = counts[best[improved], improved]
+                self.best_models[improved] = F_batch[best[improved]]
+                for j in improved:
+                    bounds[j] = min(bounds[j], self.threshold_bound(j, distances[best[j]],
+                                                                    n_points))
+
+        self.actual_iters = iteration
+        self.elapsed = time.perf_counter() - start
+        with span('sweep.refit'):
+            return self.refit_all(pts_left, pts_right, hom_left, hom_right)
+
+    def refit_all(self, pts_left, pts_right, hom_left, hom_right):
+        n_points = len(pts_left)
+        self.best_masks = np.zeros((len(self.thresholds), n_points), dtype=bool)
+        results = []
+        for j, threshold in enumerate(self.thresholds):
+            result = {'threshold': float(threshold), 'F': None, 'inlier_mask': None,
+                      'inlier_count': 0, 'inlier_ratio': 0.0}
+            if self.best_counts[j] < 8:
+                results.append(result)
+                continue
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mask = self.compute_epipolar_distance(self.best_models[j], hom_left,
+                                                      hom_right) < threshold
+            F = estimate_fundamental_8point(pts_left[mask], pts_right[mask])
+            distances = symmetric_epipolar_distances(F, pts_left[mask], pts_right[mask])
+            self.best_masks[j] = mask
+            result.update({
+                'F': F,
+                'inlier_mask': mask,
+                'inlier_count': int(mask.sum()),
+                'inlier_ratio': float(mask.sum() / n_points),
+                'symmetric_distance_mean': float(np.mean(distances)),
+                'symmetric_distance_median': float(np.median(distances)),
+                'symmetric_distance_max': float(np.max(distances))
+            })
+            results.append(result)
+        return results
+
+    def get_statistics(self):
+        if self.best_counts is None:
+            return {}
+        stats = {
+            'thresholds': self.thresholds.tolist(),
+            'inlier_counts': self.best_counts.tolist(),
+            'actual_iterations': int(self.actual_iters),
+            'hypotheses': int(self.hypotheses),
+            'consensus_time_ms': float(1e3 * self.elapsed)
+        }
+        if self.sampler_name == 'prosac':
+            stats['prosac_n_star'] = self.n_stars.tolist()
+        return stats
@@ -0,0 +1,136 @@
+import os
+import json
+import hashlib
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+def keypoints_to_array(keypoints):
+    return np.array([(kp.pt[0], kp.pt[1], kp.size, kp.angle, kp.response, kp.octave, kp.class_id)
+                     for kp in keypoints], dtype=np.float64).reshape(-1, 7)
+
+def array_to_keypoints(array):
+    return [cv2.KeyPoint(float(x), float(y), float(size), float(angle), float(response),
+                         int(octave), int(class_id))
+            for x, y, size, angle, response, octave, class_id in np.asarray(array).tolist()]
+
+class FeatureCache:
+    def __init__(self, cache_dir, max_bytes=1 << 30):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._scan()
+        self.total_bytes = sum(self._index.values())
+
+    def _paths(self, key):
+        return (os.path.join(self.cache_dir, f"{key}_kp.npy"),
+                os.path.join(self.cache_dir, f"{key}_desc.npy"))
+
+    def _scan(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('_kp.npy'):
+                continue
+            key = name[:-len('_kp.npy')]
+            kp_path, desc_path = self._paths(key)
+            try:
+                size = os.path.getsize(kp_path) + os.path.getsize(desc_path)
+                entries.append((os.path.getmtime(kp_path), key, size))
+            except FileNotFoundError:
+                continue
+        return OrderedDict((key, size) for _, key, size in sorted(entries))
+
+    def make_key(self, img, params):
+        h = hashlib.blake2b(digest_size=16)
+        h.update(np.ascontiguousarray(img).data)
+        h.update(f"{img.shape}{img.dtype}".encode())
+        h.update(json.dumps(params, sort_keys=True).encode())
+        return h.hexdigest()
+
+    def get(self, key):
+        kp_path, desc_path = self._paths(key)
+        if key not in self._index and not (os.path.exists(kp_path) and os.path.exists(desc_path)):
+            self.misses += 1
+            return None
+
+        try:
+            kp_array = np.load(kp_path, mmap_mode='r')
+            descriptors = np.load(desc_path, mmap_mode='r')
+            os.utime(kp_path)
+            size = os.path.getsize(kp_path) + os.path.getsize(desc_path)
+            self.total_bytes += size - self._index.get(key, 0)
+            self._index[key] = size
+        except (OSError, ValueError):
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._index.move_to_end(key)
+        self.hits += 1
+        return kp_array, (descriptors if len(descriptors) else None)
+
+    def put(self, key, keypoints, descriptors):
+        kp_array = keypoints_to_array(keypoints)
+        if descriptors is None:
+            descriptors = np.zeros((0, 0), dtype=np.float32)
+
+        size = 0
+        for path, array in zip(self._paths(key), (kp_array, descriptors)):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(array))
+            os.replace(tmp_path, path)
+            size += os.path.getsize(path)
+
+        self._index.pop(key, None)
+        self._index[key] = size
+        self._evict()
+
+    def _remove(self, key):
+        self.total_bytes -= self._index.pop(key, 0)
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        self._index = self._scan()
+        self.total_bytes = sum(self._index.values())
+        while self.total_bytes > self.max_bytes and len(self._index) > 1:
+            key = next(iter(self._index))
+            self._remove(key)
+            self.evictions += 1
+
+    def get_statistics(self):
+        lookups = self.hits + self.misses
+        return {
+            'cache_hits': self.hits,
+            'cache_misses': self.misses,
+            'cache_hit_rate': self.hits / lookups if lookups else 0.0,
+            'cache_evictions': self.evictions,
+            'cache_entries': len(self._index),
+            'cache_bytes': int(self.total_bytes)
+        }
+
+class CachedFeatureDetector:
+    def __init__(self, detector, cache):
+        self.detector = detector
+        self.cache = cache
+
+    def detect_and_compute(self, img):
+        key = self.cache.make_key(img, self.detector.get_params())
+        cached = self.cache.get(key)
+        if cached is not None:
+            kp_array, descriptors = cached
+            return array_to_keypoints(kp_array), descriptors
+
+        keypoints, descriptors = self.detector.detect_and_compute(img)
+        self.cache.put(key, keypoints, descriptors)
+        return keypoints, descriptors
+
+    def visualize_keypoints(self, img, keypoints):
+        return self.detector.visualize_keypoints(img, keypoints)
@@ -1,21 +1,183 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import cv2
+import numpy as np
+
+SELECTIONS = (None, 'grid', 'anms')
+
+def create_detector(method, nfeatures=0, contrastThreshold=0.03):
+    if method == 'sift':
+        return cv2.SIFT_create(nfeatures=nfeatures, contrastThreshold=contrastThreshold)
+    if method == 'orb':
+        return cv2.ORB_create(nfeatures=nfeatures if nfeatures > 0 else 1000)
+    raise ValueError(f"Unsupported method: {method}")
+
+def tile_grid(img_shape, tiles):
+    h, w = img_shape[:2]
+    rows, cols = tiles
+    ys = np.linspace(0, h, rows + 1).round().astype(int)
+    xs = np.linspace(0, w, cols + 1).round().astype(int)
+    return [(int(ys[r]), int(ys[r + 1]), int(xs[c]), int(xs[c + 1]))
+            for r in range(rows) for c in range(cols)]
+
+def detect_in_tiles(detect, gray, tiles, overlap=32, n_threads=None):
+    h, w = gray.shape[:2]
+
+    def run(tile):
+        y0, y1, x0, x1 = tile
+        oy, ox = max(y0 - overlap, 0), max(x0 - overlap, 0)
+        kps, desc = detect(gray[oy:min(y1 + overlap, h), ox:min(x1 + overlap, w)])
+        if desc is None or len(kps) == 0:
+            return [], None
+        pts = np.array([kp.pt for kp in kps], dtype=np.float64) + (ox, oy)
+        inside = np.flatnonzero((pts[:, 0] >= x0) & (pts[:, 0] < x1) &
+                                (pts[:, 1] >= y0) & (pts[:, 1] < y1))
+        kept = []
+        for i in inside:
+            kps[i].pt = (pts[i, 0], pts[i, 1])
+            kept.append(kps[i])
+        return kept, desc[inside]
+
+    if n_threads == 1 or len(tiles) == 1:
+        results = [run(tile) for tile in tiles]
+    else:
+        with ThreadPoolExecutor(max_workers=n_threads) as pool:
+            results = list(pool.map(run, tiles))
+
+    keypoints, descriptors, tile_ids = [], [], []
+    for tile, (kps, desc) in enumerate(results):
+        if desc is None or len(kps) == 0:
+            continue
+        keypoints.extend(kps)
+        descriptors.append(desc)
+        tile_ids.append(np.full(len(kps), tile, dtype=np.int64))
+    if not descriptors:
+        return keypoints, None, np.zeros(0, dtype=np.int64)
+    return keypoints, np.concatenate(descriptors), np.concatenate(tile_ids)
+
+def select_grid(points, responses, img_shape, budget, grid=(8, 8), cell_cap=None):
+    h, w = img_shape[:2]
+    rows, cols = grid
+    gx = np.clip((points[:, 0] * cols / w).astype(np.int64), 0, cols - 1)
+    gy = np.clip((points[:, 1] * rows / h).astype(np.int64), 0, rows - 1)
+    cells = gy * cols + gx
+
+    order = np.lexsort((-responses, cells))
+    sorted_cells = cells[order]
+    first = np.searchsorted(sorted_cells, sorted_cells)
+    rank = np.empty(len(points), dtype=np.int64)
+    rank[order] = np.arange(len(points)) - first
+
+    candidates = np.arange(len(points))
+    if cell_cap is not None:
+        candidates = candidates[rank < cell_cap]
+    selected = candidates[np.lexsort((-responses[candidates], rank[candidates]))[:budget]]
+    return np.sort(selected)
+
+def select_anms(points, responses, budget, robust=0.9, max_candidates=None, chunk_size=1024):
+    order = np.argsort(-responses, kind='stable')
+    if max_candidates is not None:
+        order = order[:max_candidates]
+    points = (points[order] - points[order].mean(axis=0)).astype(np.float32)
+    sorted_responses = responses[order]
+    stronger = np.searchsorted(-sorted_responses, -sorted_responses / robust, side='left')
+    sq_norms = np.einsum('ij,ij->i', points, points)
+
+    radii = np.full(len(order), np.inf)
+    for start in range(0, len(order), chunk_size):
+        stop = min(start + chunk_size, len(order))
+        width = int(stronger[start:stop].max())
+        if width == 0:
+            continue
+        dist = (sq_norms[start:stop, None] + sq_norms[None, :width] -
+                2 * points[start:stop] @ points[:width].T)
+        dist[np.arange(width)[None, :] >= stronger[start:stop, None]] = np.inf
+        radii[start:stop] = dist.min(axis=1)
+
+    keep = np.argsort(-radii, kind='stable')[:budget]
+    return np.sort(order[keep])
 
 class FeatureDetector:
-    def __init__(self, method='sift', nfeatures=0, contrastThreshold=0.03):
+    def __init__(self, method='sift', nfeatures=0, contrastThreshold=0.03, selection=None,
+                 max_keypoints=None, grid=(8, 8), cell_cap=None, tiles=None, tile_overlap=32,
+                 tile_features=None, n_threads=None):
         self.method = method.lower()
-        if self.method == 'sift':
-            self.detector = cv2.SIFT_create(nfeatures=nfeatures,
-                                           contrastThreshold=contrastThreshold)
-        elif self.method == 'orb':
-            self.detector = cv2.ORB_create(nfeatures=nfeatures if nfeatures > 0 else 1000)
+        self.nfeatures = nfeatures
+        self.contrastThreshold = contrastThreshold
+        if selection not in SELECTIONS:
+            raise ValueError(f"Unsupported selection: {selection}")
+        if selection is not None and not max_keypoints:
+            raise ValueError("Keypoint selection requires max_keypoints")
+        self.selection = selection
+        self.max_keypoints = max_keypoints
+        self.grid = tuple(grid)
+        self.cell_cap = cell_cap
+        self.tiles = tuple(tiles) if tiles is not None else None
+        self.tile_overlap = tile_overlap
+        self.tile_features = tile_features
+        self.n_threads = n_threads
+        self.detector = create_detector(self.method, nfeatures, contrastThreshold)
+        self._local = threading.local()
+
+    def get_params(self):
+        params = {'method': self.method, 'nfeatures': self.nfeatures,
+                  'contrastThreshold': self.contrastThreshold}
+        if self.selection is not None:
+            params.update({'selection': self.selection, 'max_keypoints': self.max_keypoints,
+                           'grid': list(self.grid), 'cell_cap': self.cell_cap})
+        if self.tiles is not None:
+            params.update({'tiles': list(self.tiles), 'tile_overlap': self.tile_overlap,
+                           'tile_features': self.tile_features})
+        return params
+
+    def tile_detector(self):
+        detector = getattr(self._local, 'detector', None)
+        if detector is None:
+            nfeatures = self.tile_features if self.tile_features is not None else self.nfeatures
+            detector = self._local.detector = create_detector(self.method, nfeatures,
+                                                              self.contrastThreshold)
+        return detector
+
+    def detect_and_compute_tile(self, gray):
+        return self.tile_detector().detectAndCompute(gray, None)
+
+    def detect_tiled(self, gray, tiles=None):
+        tiles = tile_grid(gray.shape, self.tiles) if tiles is None else tiles
+        keypoints, descriptors, tile_ids = detect_in_tiles(
+            self.detect_and_compute_tile, gray, tiles, self.tile_overlap, self.n_threads)
+        if self.selection is not None and descriptors is not None:
+            selected = self.select_indices(keypoints, gray.shape)
+            keypoints = [keypoints[i] for i in selected]
+            descriptors, tile_ids = descriptors[selected], tile_ids[selected]
+        return keypoints, descriptors, tile_ids
+
+    def select_indices(self, keypoints, img_shape):
+        if self.selection is None or len(keypoints) <= self.max_keypoints:
+            return np.arange(len(keypoints))
+        points = np.array([kp.pt for kp in keypoints], dtype=np.float64)
+        responses = np.array([kp.response for kp in keypoints], dtype=np.float64)
+        if self.selection == 'grid':
+            selected = select_grid(points, responses, img_shape, self.max_keypoints,
+                                   self.grid, self.cell_cap)
         else:
-            raise ValueError(f"Unsupported method: {method}")
+            selected = select_anms(points, responses, self.max_keypoints,
+                                   max_candidates=10 * self.max_keypoints)
+        return selected
+
+    def select(self, keypoints, img_shape):
+        return [keypoints[i] for i in self.select_indices(keypoints, img_shape)]
 
     def detect_and_compute(self, img):
         if len(img.shape) == 3:
             gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         else:
             gray = img
+        if self.tiles is not None:
+            keypoints, descriptors, _ = self.detect_tiled(gray)
+            return keypoints, descriptors
+        if self.selection is not None:
+            keypoints = self.select(self.detector.detect(gray, None), gray.shape)
+            return self.detector.compute(gray, keypoints)
         keypoints, descriptors = self.detector.detectAndCompute(gray, None)
         return keypoints, descriptors
 
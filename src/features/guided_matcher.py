@@ -0,0 +1,141 @@
+import cv2
+import numpy as np
+from .hamming import hamming_pair_distances
+
+def keypoint_coordinates(keypoints):
+    return np.array([kp.pt for kp in keypoints], dtype=np.float64).reshape(-1, 2)
+
+def expand_ranges(starts, counts):
+    total = int(np.sum(counts))
+    group = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return group, np.repeat(starts, counts) + offsets
+
+def pair_distances(desc1, desc2, idx1, idx2, chunk_size=1 << 16):
+    if desc1.dtype == np.uint8:
+        return hamming_pair_distances(desc1, desc2, idx1, idx2, chunk_size)
+    distances = np.empty(len(idx1), dtype=np.float32)
+    for start in range(0, len(idx1), chunk_size):
+        stop = start + chunk_size
+        diff = (desc1[idx1[start:stop]].astype(np.float32) -
+                desc2[idx2[start:stop]].astype(np.float32))
+        distances[start:stop] = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+    return distances
+
+class EpipolarGrid:
+    def __init__(self, points, img_shape, cell_size=32):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.cell_size = cell_size
+        h, w = img_shape[:2]
+        self.ncols = max(1, int(np.ceil(w / cell_size)))
+        self.nrows = max(1, int(np.ceil(h / cell_size)))
+
+        gx = np.clip((self.points[:, 0] // cell_size).astype(np.int64), 0, self.ncols - 1)
+        gy = np.clip((self.points[:, 1] // cell_size).astype(np.int64), 0, self.nrows - 1)
+        cells = gy * self.ncols + gx
+        self.order = np.argsort(cells, kind='stable')
+        sorted_cells = cells[self.order]
+        ncells = self.ncols * self.nrows
+        self.starts = np.searchsorted(sorted_cells, np.arange(ncells))
+        self.counts = np.searchsorted(sorted_cells, np.arange(ncells), side='right') - self.starts
+
+    def _band_cells(self, lines, band, transpose):
+        a, b, c = lines[:, 0], lines[:, 1], lines[:, 2]
+        if transpose:
+            a, b = b, a
+        major, minor = (self.nrows, self.ncols) if transpose else (self.ncols, self.nrows)
+        s = self.cell_size
+
+        edges = np.arange(major + 1) * s
+        with np.errstate(divide='ignore', invalid='ignore'):
+            along = -(a[:, None] * edges[None, :] + c[:, None]) / b[:, None]
+        lo = np.minimum(along[:, :-1], along[:, 1:]) - band / np.abs(b)[:, None]
+        hi = np.maximum(along[:, :-1], along[:, 1:]) + band / np.abs(b)[:, None]
+        first = np.clip(np.floor(lo / s), 0, minor).astype(np.int64)
+        last = np.clip(np.floor(hi / s), -1, minor - 1).astype(np.int64)
+        spans = np.maximum(last - first + 1, 0)
+
+        line_idx, column = np.nonzero(spans)
+        spans, first = spans[line_idx, column], first[line_idx, column]
+        group, offset = expand_ranges(np.zeros(len(spans), dtype=np.int64), spans)
+        rows = first[group] + offset
+        cols = column[group]
+        line_idx = line_idx[group]
+        cells = cols * self.ncols + rows if transpose else rows * self.ncols + cols
+        return line_idx, cells
+
+    def query(self, lines, band):
+        lines = np.asarray(lines, dtype=np.float64).reshape(-1, 3)
+        norm = np.sqrt(lines[:, 0]**2 + lines[:, 1]**2)
+        valid = norm > 1e-12
+        lines = lines / np.where(valid, norm, 1)[:, None]
+        index = np.arange(len(lines))
+
+        line_parts, cell_parts = [], []
+        x_major = valid & (np.abs(lines[:, 1]) >= np.abs(lines[:, 0]))
+        y_major = valid & ~x_major
+        for mask, transpose in ((x_major, False), (y_major, True)):
+            if np.any(mask):
+                line_idx, cells = self._band_cells(lines[mask], band, transpose)
+                line_parts.append(index[mask][line_idx])
+                cell_parts.append(cells)
+        if not line_parts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        line_idx = np.concatenate(line_parts)
+        cells = np.concatenate(cell_parts)
+        counts = self.counts[cells]
+        group, positions = expand_ranges(self.starts[cells], counts)
+        query_idx = line_idx[group]
+        point_idx = self.order[positions]
+
+        residual = np.abs(np.einsum('ij,ij->i', lines[query_idx, :2], self.points[point_idx]) +
+                          lines[query_idx, 2])
+        inside = residual <= band
+        return query_idx[inside], point_idx[inside]
+
+class GuidedMatcher:
+    def __init__(self, band=2.0, ratio_threshold=0.8, cell_size=32, one_to_one=True):
+        self.band = band
+        self.ratio_threshold = ratio_threshold
+        self.cell_size = cell_size
+        self.one_to_one = one_to_one
+        self.candidate_pairs = 0
+
+    def match(self, kp1, desc1, kp2, desc2, F, img_shape, return_scores=False):
+        empty = ([], np.zeros(0, dtype=np.float32)) if return_scores else []
+        if desc1 is None or desc2 is None or len(desc1) == 0 or len(desc2) == 0 or F is None:
+            return empty
+
+        pts1 = keypoint_coordinates(kp1)
+        grid = EpipolarGrid(keypoint_coordinates(kp2), img_shape, self.cell_size)
+        lines = np.hstack([pts1, np.ones((len(pts1), 1))]) @ F.T
+        idx1, idx2 = grid.query(lines, self.band)
+        self.candidate_pairs = len(idx1)
+        if len(idx1) == 0:
+            return empty
+
+        distances = pair_distances(desc1, desc2, idx1, idx2)
+        order = np.lexsort((distances, idx1))
+        idx1, idx2, distances = idx1[order], idx2[order], distances[order]
+
+        first = np.flatnonzero(np.r_[True, idx1[1:] != idx1[:-1]])
+        has_second = np.r_[first[1:], len(idx1)] - first > 1
+        second = np.full(len(first), np.inf, dtype=np.float32)
+        second[has_second] = distances[first[has_second] + 1]
+        best = distances[first]
+        keep = best < self.ratio_threshold * second
+
+        query, train, best, second = idx1[first][keep], idx2[first][keep], best[keep], second[keep]
+        if self.one_to_one and len(train):
+            order = np.lexsort((best, train))
+            unique = np.r_[True, train[order][1:] != train[order][:-1]]
+            selected = np.sort(order[unique])
+            query, train, best, second = query[selected], train[selected], best[selected], second[selected]
+
+        matches = [cv2.DMatch(int(q), int(t), float(d)) for q, t, d in zip(query, train, best)]
+        if return_scores:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores = np.where(np.isfinite(second), 1 - best / second, 1.0).astype(np.float32)
+            return matches, scores
+        return matches
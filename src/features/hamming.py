@@ -0,0 +1,60 @@
+import numpy as np
+
+POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def _packed_words(desc):
+    desc = np.ascontiguousarray(desc, dtype=np.uint8)
+    if hasattr(np, 'bitwise_count') and desc.shape[1] % 8 == 0:
+        return desc.view(np.uint64)
+    return desc
+
+def popcount_sum(xor):
+    if xor.dtype == np.uint8:
+        return POPCOUNT_TABLE[xor].sum(axis=-1, dtype=np.int32)
+    return np.bitwise_count(xor).sum(axis=-1, dtype=np.int32)
+
+def hamming_pair_distances(desc1, desc2, idx1, idx2, chunk_size=1 << 16):
+    words1, words2 = _packed_words(desc1), _packed_words(desc2)
+    distances = np.empty(len(idx1), dtype=np.float32)
+    for start in range(0, len(idx1), chunk_size):
+        stop = start + chunk_size
+        distances[start:stop] = popcount_sum(words1[idx1[start:stop]] ^ words2[idx2[start:stop]])
+    return distances
+
+def hamming_distance_block(words1, words2):
+    shape = (len(words1), len(words2))
+    dist = np.zeros(shape, dtype=np.int32)
+    xor = np.empty(shape, dtype=words1.dtype)
+    bits = np.empty(shape, dtype=np.uint8)
+    for w in range(words1.shape[1]):
+        np.bitwise_xor(words1[:, w, None], words2[None, :, w], out=xor)
+        if xor.dtype == np.uint8:
+            np.take(POPCOUNT_TABLE, xor, out=bits)
+        else:
+            np.bitwise_count(xor, out=bits)
+        np.add(dist, bits, out=dist)
+    return dist
+
+def hamming_knn(desc1, desc2, k=2, max_block_bytes=64 << 20):
+    words1, words2 = _packed_words(desc1), _packed_words(desc2)
+    n, m = len(words1), len(words2)
+    k_eff = min(k, m)
+    chunk_size = max(1, max_block_bytes // (max(m, 1) * 32))
+
+    indices = np.full((n, k), -1, dtype=np.int64)
+    distances = np.full((n, k), np.inf, dtype=np.float32)
+    if k_eff == 0:
+        return indices, distances
+
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        dist = hamming_distance_block(words1[start:stop], words2)
+        if k_eff < m:
+            nearest = np.argpartition(dist, k_eff - 1, axis=1)[:, :k_eff]
+        else:
+            nearest = np.broadcast_to(np.arange(m), (stop - start, m))
+        nearest_dist = np.take_along_axis(dist, nearest, axis=1)
+        order = np.argsort(nearest_dist, axis=1, kind='stable')
+        indices[start:stop, :k_eff] = np.take_along_axis(nearest, order, axis=1)
+        distances[start:stop, :k_eff] = np.take_along_axis(nearest_dist, order, axis=1)
+    return indices, distances
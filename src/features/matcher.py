@@ -1,35 +1,75 @@
 import cv2
 import numpy as np
+from .hamming import hamming_knn
+
+FLANN_INDEX_KDTREE = 1
+FLANN_INDEX_LSH = 6
+METHODS = ('flann', 'bf', 'hamming')
+
+def is_binary_descriptor(desc):
+    return desc.dtype == np.uint8
 
 class FeatureMatcher:
     def __init__(self, method='flann', ratio_threshold=0.75, cross_check=False):
         self.method = method.lower()
         self.ratio_threshold = ratio_threshold
         self.cross_check = cross_check
-
-        if self.method == 'flann':
-            FLANN_INDEX_KDTREE = 1
-            index_params = dict(algorithm=FLANN_INDEX_KDTREE, trees=5)
-            search_params = dict(checks=50)
-            self.matcher = cv2.FlannBasedMatcher(index_params, search_params)
-        elif self.method == 'bf':
-            self.matcher = cv2.BFMatcher(cv2.NORM_L2, crossCheck=False)
-        else:
+        if self.method not in METHODS:
             raise ValueError(f"Unsupported method: {method}")
+        self._matchers = {}
+
+    def get_matcher(self, binary):
+        if binary not in self._matchers:
+            if self.method == 'flann' and binary:
+                index_params = dict(algorithm=FLANN_INDEX_LSH, table_number=6, key_size=12,
+                                    multi_probe_level=1)
+                self._matchers[binary] = cv2.FlannBasedMatcher(index_params, dict(checks=50))
+            elif self.method == 'flann':
+                index_params = dict(algorithm=FLANN_INDEX_KDTREE, trees=5)
+                self._matchers[binary] = cv2.FlannBasedMatcher(index_params, dict(checks=50))
+            else:
+                norm = cv2.NORM_HAMMING if binary else cv2.NORM_L2
+                self._matchers[binary] = cv2.BFMatcher(norm, crossCheck=False)
+        return self._matchers[binary]
+
+    def knn(self, desc1, desc2, k=2):
+        binary = is_binary_descriptor(desc1)
+        if binary and self.method == 'hamming':
+            return hamming_knn(desc1, desc2, k)
+        if not binary:
+            desc1 = np.asarray(desc1, dtype=np.float32)
+            desc2 = np.asarray(desc2, dtype=np.float32)
+
+        indices = np.full((len(desc1), k), -1, dtype=np.int64)
+        distances = np.full((len(desc1), k), np.inf, dtype=np.float32)
+        for neighbours in self.get_matcher(binary).knnMatch(desc1, desc2, k=k):
+            for rank, m in enumerate(neighbours[:k]):
+                indices[m.queryIdx, rank] = m.trainIdx
+                distances[m.queryIdx, rank] = m.distance
+        return indices, distances
 
-    def match(self, desc1, desc2):
+    def match(self, desc1, desc2, return_scores=False):
         if desc1 is None or desc2 is None or len(desc1) == 0 or len(desc2) == 0:
-            return []
+            return ([], np.zeros(0, dtype=np.float32)) if return_scores else []
+        if is_binary_descriptor(desc1) != is_binary_descriptor(desc2):
+            raise ValueError("Descriptor types of both images must match")
 
-        matches = self.matcher.knnMatch(desc1, desc2, k=2)
+        indices, distances = self.knn(desc1, desc2, k=2)
+        with np.errstate(invalid='ignore'):
+            good = (indices[:, 1] >= 0) & (distances[:, 0] < self.ratio_threshold * distances[:, 1])
 
-        good_matches = []
-        for match_pair in matches:
-            if len(match_pair) == 2:
-                m, n = match_pair
-                if m.distance < self.ratio_threshold * n.distance:
-                    good_matches.append(m)
+        if self.cross_check and np.any(good):
+            reverse, _ = self.knn(desc2, desc1, k=1)
+            good &= reverse[np.maximum(indices[:, 0], 0), 0] == np.arange(len(desc1))
 
+        query = np.flatnonzero(good)
+        good_matches = [cv2.DMatch(int(q), int(t), float(d))
+                        for q, t, d in zip(query, indices[query, 0], distances[query, 0])]
+        if return_scores:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores = np.where(distances[query, 1] > 0,
+                                  1 - distances[query, 0] / distances[query, 1], 0.0)
+            return good_matches, scores.astype(np.float32)
         return good_matches
 
     def extract_matched_points(self, kp1, kp2, matches):
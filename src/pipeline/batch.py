@@ -0,0 +1,121 @@
+import os
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import cv2
+from ..utils.io_utils import load_manifest
+from .two_view import TwoViewPipeline
+from .coarse_to_fine import CoarseToFinePipeline
+
+COMPLETED_STATUSES = ('ok', 'no_model')
+
+_pipeline = None
+
+def _init_worker(config):
+    global _pipeline
+    cv2.setNumThreads(1)
+    config = dict(config)
+    coarse_to_fine = config.pop('coarse_to_fine', None)
+    if coarse_to_fine:
+        _pipeline = CoarseToFinePipeline(**config, **coarse_to_fine)
+    else:
+        _pipeline = TwoViewPipeline(**config)
+
+def _process(pair):
+    record = {'id': pair['id'], 'left': pair['left'], 'right': pair['right']}
+    start = time.perf_counter()
+    try:
+        result = _pipeline.process_pair(pair['left'], pair['right'])
+    except Exception as e:
+        record.update({'status': 'error', 'error': f"{type(e).__name__}: {e}",
+                       'timings_ms': {'total': 1e3 * (time.perf_counter() - start)}})
+        return record
+
+    F = result['F']
+    record.update({
+        'status': 'ok' if F is not None else 'no_model',
+        'F': F.ravel().tolist() if F is not None else None,
+        'inlier_count': result['inlier_count'],
+        'num_matches': result['num_matches'],
+        'num_features_left': result['num_features_left'],
+        'num_features_right': result['num_features_right'],
+        'timings_ms': {k: 1e3 * v for k, v in result['timings'].items()}
+    })
+    stats = result.get('ransac_statistics', {})
+    if 'achieved_confidence' in stats:
+        record['achieved_confidence'] = stats['achieved_confidence']
+    if 'budget_exhausted' in stats:
+        record['budget_exhausted'] = stats['budget_exhausted']
+    if 'num_guided_matches' in result:
+        record['num_guided_matches'] = result['num_guided_matches']
+    if 'stage' in result:
+        record.update({'stage': result['stage'],
+                       'coarse_inlier_count': result['coarse_inlier_count']})
+    return record
+
+def load_completed_ids(output_path):
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, 'r') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                if record['status'] in COMPLETED_STATUSES:
+                    completed.add(record['id'])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return completed
+
+def _ends_with_newline(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return True
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+def run_batch(manifest_path, output_path, config=None, n_workers=None, max_in_flight=None,
+              progress=None):
+    pairs = load_manifest(manifest_path)
+    completed = load_completed_ids(output_path)
+    pending = [pair for pair in pairs if pair['id'] not in completed]
+
+    n_workers = n_workers or os.cpu_count()
+    max_in_flight = max_in_flight or 2 * n_workers
+    summary = {'total': len(pairs), 'skipped': len(pairs) - len(pending),
+               'processed': 0, 'failed': 0}
+
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    newline_needed = not _ends_with_newline(output_path)
+
+    with open(output_path, 'a') as out, \
+            ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                initargs=(config or {},)) as pool:
+        if newline_needed:
+            out.write('\n')
+
+        in_flight = set()
+        for pair in pending:
+            in_flight.add(pool.submit(_process, pair))
+            if len(in_flight) < max_in_flight:
+                continue
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            _write_records(out, done, summary, progress)
+
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            _write_records(out, done, summary, progress)
+
+    return summary
+
+def _write_records(out, futures, summary, progress):
+    for future in futures:
+        record = future.result()
+        out.write(json.dumps(record) + '\n')
+        summary['processed'] += 1
+        if record['status'] == 'error':
+            summary['failed'] += 1
+        if progress is not None:
+            progress(record, summary)
+    out.flush()
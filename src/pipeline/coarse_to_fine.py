@@ -0,0 +1,185 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+from ..utils.io_utils import load_image_reduced
+from ..features.detector import FeatureDetector
+from ..features.guided_matcher import GuidedMatcher
+from ..core.ransac import FundamentalMatrixRANSAC
+from ..utils.profiling import span
+from .two_view import TwoViewPipeline
+
+def reduction_transform(reduction):
+    offset = (reduction - 1) / 2
+    return np.array([[reduction, 0, offset], [0, reduction, offset], [0, 0, 1]], dtype=np.float64)
+
+def upscale_fundamental(F, reduction):
+    S_inv = np.linalg.inv(reduction_transform(reduction))
+    F_full = S_inv.T @ F @ S_inv
+    return F_full / np.linalg.norm(F_full)
+
+def upscale_points(points, reduction):
+    return reduction * np.asarray(points, dtype=np.float64) + (reduction - 1) / 2
+
+def tile_index(points, img_shape, tile_size):
+    h, w = img_shape[:2]
+    ncols = max(1, int(np.ceil(w / tile_size)))
+    nrows = max(1, int(np.ceil(h / tile_size)))
+    gx = np.clip((points[:, 0] // tile_size).astype(np.int64), 0, ncols - 1)
+    gy = np.clip((points[:, 1] // tile_size).astype(np.int64), 0, nrows - 1)
+    return gy * ncols + gx, ncols
+
+def tile_bounds(cells, ncols, img_shape, tile_size):
+    h, w = img_shape[:2]
+    rows, cols = np.divmod(cells, ncols)
+    return [(int(r * tile_size), int(min((r + 1) * tile_size, h)),
+             int(c * tile_size), int(min((c + 1) * tile_size, w))) for r, c in zip(rows, cols)]
+
+def select_tile_pairs(support_left, support_right, shape_left, shape_right, tile_size,
+                      max_pairs=None):
+    cells_left, ncols_left = tile_index(support_left, shape_left, tile_size)
+    cells_right, ncols_right = tile_index(support_right, shape_right, tile_size)
+    pairs, support = np.unique(np.stack([cells_left, cells_right], axis=1), axis=0,
+                               return_counts=True)
+    pairs = pairs[np.argsort(-support, kind='stable')]
+    if max_pairs is not None:
+        pairs = pairs[:max_pairs]
+
+    unique_left, links_left = np.unique(pairs[:, 0], return_inverse=True)
+    unique_right, links_right = np.unique(pairs[:, 1], return_inverse=True)
+    tiles_left = tile_bounds(unique_left, ncols_left, shape_left, tile_size)
+    tiles_right = tile_bounds(unique_right, ncols_right, shape_right, tile_size)
+    return tiles_left, tiles_right, np.stack([links_left.ravel(), links_right.ravel()], axis=1)
+
+class CoarseToFinePipeline(TwoViewPipeline):
+    def __init__(self, detector_params=None, matcher_params=None, ransac_params=None,
+                 cache_dir=None, cache_max_bytes=1 << 30, guided_params=None, reduction=4,
+                 tile_size=256, tile_margin=16, max_tile_pairs=32, tile_features=256,
+                 fine_band=None):
+        super().__init__(detector_params, matcher_params, ransac_params, cache_dir,
+                         cache_max_bytes, guided_params)
+        self.reduction = reduction
+        self.tile_size = tile_size
+        self.tile_margin = tile_margin
+        self.max_tile_pairs = max_tile_pairs
+        self.fine_detector = FeatureDetector(**{**self.detector_params, 'tile_features': tile_features,
+                                                'tile_overlap': tile_margin})
+        self.fine_matcher = GuidedMatcher(band=fine_band if fine_band is not None else 2.0 * reduction)
+
+    def match_tiles(self, kp_left, desc_left, tiles_left, kp_right, desc_right, tiles_right,
+                    links, F, img_shape):
+        queries, trains, distances, scores = [], [], [], []
+        for tile in np.unique(links[:, 0]):
+            idx1 = np.flatnonzero(tiles_left == tile)
+            idx2 = np.flatnonzero(np.isin(tiles_right, links[links[:, 0] == tile, 1]))
+            if len(idx1) == 0 or len(idx2) == 0:
+                continue
+            matches, tile_scores = self.fine_matcher.match(
+                [kp_left[i] for i in idx1], desc_left[idx1], [kp_right[i] for i in idx2],
+                desc_right[idx2], F, img_shape, return_scores=True)
+            queries.append(idx1[[m.queryIdx for m in matches]])
+            trains.append(idx2[[m.trainIdx for m in matches]])
+            distances.append(np.array([m.distance for m in matches], dtype=np.float32))
+            scores.append(tile_scores)
+        if not queries:
+            return [], np.zeros(0, dtype=np.float32)
+
+        query, train = np.concatenate(queries), np.concatenate(trains)
+        distance, score = np.concatenate(distances), np.concatenate(scores)
+        order = np.lexsort((distance, train))
+        unique = np.sort(order[np.r_[True, train[order][1:] != train[order][:-1]]])
+        matches = [cv2.DMatch(int(q), int(t), float(d))
+                   for q, t, d in zip(query[unique], train[unique], distance[unique])]
+        return matches, score[unique]
+
+    def refine(self, full_left, full_right, coarse):
+        timings = coarse['timings']
+        F_full = upscale_fundamental(coarse['F'], self.reduction)
+        inliers = coarse['inlier_mask']
+        support_left = upscale_points(coarse['pts_left'][inliers], self.reduction)
+        support_right = upscale_points(coarse['pts_right'][inliers], self.reduction)
+
+        start = time.perf_counter()
+        with span('fine.detect'):
+            tiles_left, tiles_right, links = select_tile_pairs(
+                support_left, support_right, full_left.shape, full_right.shape, self.tile_size,
+                self.max_tile_pairs)
+            kp_left, desc_left, ids_left = self.fine_detector.detect_tiled(full_left, tiles_left)
+            kp_right, desc_right, ids_right = self.fine_detector.detect_tiled(full_right, tiles_right)
+        timings['fine_detect'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with span('fine.match'):
+            matches, scores = [], None
+            if desc_left is not None and desc_right is not None:
+                matches, scores = self.match_tiles(kp_left, desc_left, ids_left, kp_right,
+                                                   desc_right, ids_right, links, F_full,
+                                                   full_right.shape)
+        timings['fine_match'] = time.perf_counter() - start
+
+        result = {
+            'num_tiles_left': len(tiles_left),
+            'num_tiles_right': len(tiles_right),
+            'num_fine_features_left': len(kp_left),
+            'num_fine_features_right': len(kp_right),
+            'num_fine_matches': len(matches),
+            'F': F_full,
+            'stage': 'coarse'
+        }
+        if len(matches) < 8:
+            return result
+
+        pts_left, pts_right = self.matcher.extract_matched_points(kp_left, kp_right, matches)
+        start = time.perf_counter()
+        ransac = FundamentalMatrixRANSAC(**self.ransac_params)
+        with span('fine.ransac'):
+            F, inlier_mask = ransac.fit(pts_left, pts_right, scores=scores,
+                                        initial_F=F_full, min_initial_inliers=0)
+        timings['fine_ransac'] = time.perf_counter() - start
+        if F is None:
+            return result
+
+        result.update({
+            'F': F,
+            'num_matches': len(matches),
+            'pts_left': pts_left,
+            'pts_right': pts_right,
+            'inlier_mask': inlier_mask,
+            'inlier_count': int(inlier_mask.sum()),
+            'fine_statistics': ransac.get_statistics(),
+            'stage': 'fine'
+        })
+        return result
+
+    def process_pair(self, left_path, right_path):
+        start = time.perf_counter()
+        with span('load_coarse'):
+            img_left = load_image_reduced(left_path, self.reduction)
+            img_right = load_image_reduced(right_path, self.reduction)
+        if img_left is None or img_right is None:
+            raise IOError(f"Failed to read image pair: {left_path}, {right_path}")
+        load_time = time.perf_counter() - start
+
+        result = self.estimate(img_left, img_right)
+        result['stage'] = 'coarse'
+        timings = result['timings']
+        timings['load_coarse'] = load_time
+        result['coarse_inlier_count'] = result['inlier_count']
+        result['coarse_num_matches'] = result['num_matches']
+
+        if result['F'] is not None:
+            step = time.perf_counter()
+            with span('load_full'):
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    full_left, full_right = pool.map(cv2.imread, (left_path, right_path),
+                                                     (cv2.IMREAD_GRAYSCALE,) * 2)
+            if full_left is None or full_right is None:
+                raise IOError(f"Failed to read image pair: {left_path}, {right_path}")
+            timings['load_full'] = time.perf_counter() - step
+            result.update(self.refine(full_left, full_right, result))
+
+        if result['stage'] != 'fine' and 'pts_left' in result:
+            result['pts_left'] = upscale_points(result['pts_left'], self.reduction)
+            result['pts_right'] = upscale_points(result['pts_right'], self.reduction)
+        timings['total'] = time.perf_counter() - start
+        return result
@@ -0,0 +1,122 @@
+import time
+import numpy as np
+from ..features.detector import FeatureDetector
+from ..features.matcher import FeatureMatcher
+from ..core.ransac import FundamentalMatrixRANSAC
+from ..utils.profiling import span, count
+
+class SequencePipeline:
+    def __init__(self, detector_params=None, matcher_params=None, ransac_params=None,
+                 reuse_ratio=0.8, budget_ms=30.0):
+        self.detector_params = dict(detector_params or {})
+        self.matcher_params = dict(matcher_params or {})
+        self.ransac_params = dict(ransac_params or {})
+        self.reuse_ratio = reuse_ratio
+        self.budget_ms = budget_ms
+        self.detector = FeatureDetector(**self.detector_params)
+        self.matcher = FeatureMatcher(**self.matcher_params)
+        self.reset()
+
+    def reset(self):
+        self.frame_index = -1
+        self.previous = None
+        self.previous_F = None
+        self.previous_inlier_ratio = None
+        self.latencies = []
+        self.seeded_frames = 0
+        self.reused_frames = 0
+
+    def process_frame(self, frame):
+        start = time.perf_counter()
+        self.frame_index += 1
+        timings = {}
+
+        with span('sequence.detect'):
+            keypoints, descriptors = self.detector.detect_and_compute(frame)
+        timings['detect'] = time.perf_counter() - start
+
+        previous = self.previous
+        self.previous = (keypoints, descriptors)
+        result = {
+            'frame': self.frame_index,
+            'num_features': len(keypoints),
+            'num_matches': 0,
+            'F': None,
+            'inlier_mask': None,
+            'inlier_count': 0,
+            'seeded': False,
+            'reused': False,
+            'timings': timings
+        }
+        if previous is None or descriptors is None or previous[1] is None:
+            return self._finish(result, start)
+
+        kp_left, desc_left = previous
+        step = time.perf_counter()
+        with span('sequence.match'):
+            matches, scores = self.matcher.match(desc_left, descriptors, return_scores=True)
+        timings['match'] = time.perf_counter() - step
+        result['num_matches'] = len(matches)
+        if len(matches) < 8:
+            self.previous_F = None
+            return self._finish(result, start)
+
+        pts_left, pts_right = self.matcher.extract_matched_points(kp_left, keypoints, matches)
+
+        min_initial_inliers = None
+        if self.previous_F is not None:
+            min_initial_inliers = int(np.ceil(self.reuse_ratio * self.previous_inlier_ratio *
+                                              len(matches)))
+
+        step = time.perf_counter()
+        ransac = FundamentalMatrixRANSAC(**self.ransac_params)
+        with span('sequence.ransac'):
+            F, inlier_mask = ransac.fit(pts_left, pts_right, scores=scores,
+                                        initial_F=self.previous_F,
+                                        min_initial_inliers=min_initial_inliers)
+        timings['ransac'] = time.perf_counter() - step
+
+        result.update({
+            'F': F,
+            'inlier_mask': inlier_mask,
+            'inlier_count': int(np.sum(inlier_mask)) if inlier_mask is not None else 0,
+            'seeded': self.previous_F is not None,
+            'reused': ransac.initial_accepted,
+            'ransac_statistics': ransac.get_statistics()
+        })
+        self.seeded_frames += result['seeded']
+        self.reused_frames += result['reused']
+        count('sequence.reused_models', int(result['reused']))
+
+        if F is not None and result['inlier_count'] >= 8:
+            self.previous_F = F
+            self.previous_inlier_ratio = result['inlier_count'] / len(matches)
+        else:
+            self.previous_F = None
+        return self._finish(result, start)
+
+    def _finish(self, result, start):
+        total = time.perf_counter() - start
+        result['timings']['total'] = total
+        result['over_budget'] = bool(self.budget_ms is not None and 1e3 * total > self.budget_ms)
+        self.latencies.append(total)
+        return result
+
+    def get_statistics(self):
+        if not self.latencies:
+            return {}
+
+        latencies_ms = 1e3 * np.array(self.latencies)
+        stats = {
+            'frames': len(latencies_ms),
+            'latency_mean_ms': float(np.mean(latencies_ms)),
+            'latency_p50_ms': float(np.percentile(latencies_ms, 50)),
+            'latency_p95_ms': float(np.percentile(latencies_ms, 95)),
+            'latency_max_ms': float(np.max(latencies_ms)),
+            'seeded_frames': self.seeded_frames,
+            'reused_frames': self.reused_frames
+        }
+        if self.budget_ms is not None:
+            stats['budget_ms'] = self.budget_ms
+            stats['over_budget_frames'] = int(np.sum(latencies_ms > self.budget_ms))
+        return stats
@@ -0,0 +1,95 @@
+import time
+from ..utils.io_utils import load_images
+from ..features.detector import FeatureDetector
+from ..features.matcher import FeatureMatcher
+from ..features.cache import FeatureCache, CachedFeatureDetector
+from ..features.guided_matcher import GuidedMatcher
+from ..core.ransac import FundamentalMatrixRANSAC
+from ..utils.profiling import span
+
+class TwoViewPipeline:
+    def __init__(self, detector_params=None, matcher_params=None, ransac_params=None,
+                 cache_dir=None, cache_max_bytes=1 << 30, guided_params=None):
+        self.detector_params = dict(detector_params or {})
+        self.matcher_params = dict(matcher_params or {})
+        self.ransac_params = dict(ransac_params or {})
+        self.detector = FeatureDetector(**self.detector_params)
+        self.cache = None
+        if cache_dir is not None:
+            self.cache = FeatureCache(cache_dir, max_bytes=cache_max_bytes)
+            self.detector = CachedFeatureDetector(self.detector, self.cache)
+        self.matcher = FeatureMatcher(**self.matcher_params)
+        self.guided_matcher = None
+        if guided_params is not None:
+            self.guided_matcher = GuidedMatcher(**guided_params)
+
+    def estimate(self, img_left, img_right):
+        timings = {}
+
+        start = time.perf_counter()
+        with span('detect'):
+            kp_left, desc_left = self.detector.detect_and_compute(img_left)
+            kp_right, desc_right = self.detector.detect_and_compute(img_right)
+        timings['detect'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with span('match'):
+            matches, scores = self.matcher.match(desc_left, desc_right, return_scores=True)
+        timings['match'] = time.perf_counter() - start
+
+        result = {
+            'num_features_left': len(kp_left),
+            'num_features_right': len(kp_right),
+            'num_matches': len(matches),
+            'F': None,
+            'inlier_mask': None,
+            'inlier_count': 0,
+            'timings': timings
+        }
+        if len(matches) < 8:
+            return result
+
+        pts_left, pts_right = self.matcher.extract_matched_points(kp_left, kp_right, matches)
+
+        start = time.perf_counter()
+        ransac = FundamentalMatrixRANSAC(**self.ransac_params)
+        with span('ransac'):
+            F, inlier_mask = ransac.fit(pts_left, pts_right, scores=scores)
+        timings['ransac'] = time.perf_counter() - start
+        result['ransac_statistics'] = ransac.get_statistics()
+
+        if self.guided_matcher is not None and F is not None:
+            start = time.perf_counter()
+            with span('guided_match'):
+                guided, guided_scores = self.guided_matcher.match(
+                    kp_left, desc_left, kp_right, desc_right, F, img_right.shape, return_scores=True)
+                if len(guided) >= 8:
+                    pts_left, pts_right = self.matcher.extract_matched_points(kp_left, kp_right, guided)
+                    guided_ransac = FundamentalMatrixRANSAC(**self.ransac_params)
+                    F, inlier_mask = guided_ransac.fit(pts_left, pts_right, scores=guided_scores,
+                                                       initial_F=F, min_initial_inliers=0)
+                    result['guided_statistics'] = guided_ransac.get_statistics()
+            timings['guided'] = time.perf_counter() - start
+            result['num_guided_matches'] = len(guided)
+
+        result.update({
+            'F': F,
+            'pts_left': pts_left,
+            'pts_right': pts_right,
+            'inlier_mask': inlier_mask,
+            'inlier_count': int(inlier_mask.sum()) if inlier_mask is not None else 0
+        })
+        return result
+
+    def process_pair(self, left_path, right_path):
+        start = time.perf_counter()
+        with span('load'):
+            img_left, img_right = load_images(left_path, right_path)
+        if img_left is None or img_right is None:
+            raise IOError(f"Failed to read image pair: {left_path}, {right_path}")
+        load_time = time.perf_counter() - start
+
+        result = self.estimate(img_left, img_right)
+        result['timings']['load'] = load_time
+        result['timings']['total'] = time.perf_counter() - start
+        return result
@@ -1,7 +1,16 @@
+import os
+import csv
+import json
 import numpy as np
 import cv2
+from .match_io import is_correspondence_file, load_correspondences
 
-def load_matches(filepath):
+def load_matches(filepath, mmap=False):
+    if is_correspondence_file(filepath):
+        pts_left, pts_right = load_correspondences(filepath)
+        if mmap:
+            return pts_left, pts_right
+        return np.array(pts_left, dtype=np.float64), np.array(pts_right, dtype=np.float64)
     data = np.loadtxt(filepath)
     pts_left = data[:, :2]
     pts_right = data[:, 2:]
@@ -12,8 +21,37 @@ def load_images(left_path, right_path):
     img_right = cv2.imread(right_path)
     return img_left, img_right
 
+REDUCED_GRAYSCALE_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8
+}
+
+def load_image_reduced(path, reduction=1):
+    if reduction not in REDUCED_GRAYSCALE_FLAGS:
+        raise ValueError(f"Unsupported reduction: {reduction}")
+    return cv2.imread(path, REDUCED_GRAYSCALE_FLAGS[reduction])
+
 def to_homogeneous(points):
     return np.hstack([points, np.ones((points.shape[0], 1))])
 
 def from_homogeneous(points):
     return points[:, :-1] / points[:, -1:]
+
+def load_manifest(filepath):
+    pairs = []
+    if filepath.endswith('.jsonl'):
+        with open(filepath, 'r') as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(filepath, 'r', newline='') as f:
+            rows = list(csv.DictReader(f))
+
+    base_dir = os.path.dirname(os.path.abspath(filepath))
+    for row in rows:
+        left = os.path.join(base_dir, row['left'])
+        right = os.path.join(base_dir, row['right'])
+        pair_id = row.get('id') or f"{row['left']}::{row['right']}"
+        pairs.append({'id': str(pair_id), 'left': left, 'right': right})
+    return pairs
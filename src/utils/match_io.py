@@ -0,0 +1,181 @@
+import os
+from itertools import islice
+import numpy as np
+
+MAGIC = b'EPCORR01'
+VERSION = 1
+FLAG_SCORES = 1
+FLAG_DESC_IDX = 2
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('flags', '<u4'),
+    ('count', '<u8'),
+    ('reserved', '<u8', (5,))
+])
+POINT_DTYPE = np.dtype('<f4')
+SCORE_DTYPE = np.dtype('<f4')
+DESC_IDX_DTYPE = np.dtype('<i4')
+
+def is_correspondence_file(filepath):
+    with open(filepath, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def _block_layout(count, flags):
+    blocks = [('points', POINT_DTYPE, (count, 4))]
+    if flags & FLAG_SCORES:
+        blocks.append(('scores', SCORE_DTYPE, (count,)))
+    if flags & FLAG_DESC_IDX:
+        blocks.append(('desc_idx', DESC_IDX_DTYPE, (count, 2)))
+
+    layout = []
+    offset = HEADER_DTYPE.itemsize
+    for name, dtype, shape in blocks:
+        layout.append((name, dtype, shape, offset))
+        offset += dtype.itemsize * int(np.prod(shape))
+    return layout, offset
+
+def _read_header(filepath):
+    header = np.fromfile(filepath, dtype=HEADER_DTYPE, count=1)
+    if len(header) == 0 or header['magic'][0] != MAGIC:
+        raise ValueError(f"Not a correspondence file: {filepath}")
+    if header['version'][0] != VERSION:
+        raise ValueError(f"Unsupported correspondence file version: {header['version'][0]}")
+    return int(header['count'][0]), int(header['flags'][0])
+
+def _write_header(f, count, flags):
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header['magic'] = MAGIC
+    header['version'] = VERSION
+    header['flags'] = flags
+    header['count'] = count
+    f.seek(0)
+    f.write(header.tobytes())
+
+def create_correspondence_file(filepath, count, has_scores=False, has_desc_idx=False):
+    flags = (FLAG_SCORES if has_scores else 0) | (FLAG_DESC_IDX if has_desc_idx else 0)
+    layout, size = _block_layout(count, flags)
+
+    with open(filepath, 'wb') as f:
+        _write_header(f, count, flags)
+        f.truncate(size)
+    return open_correspondences(filepath, mode='r+')
+
+def open_correspondences(filepath, mode='r'):
+    count, flags = _read_header(filepath)
+    layout, size = _block_layout(count, flags)
+    if os.path.getsize(filepath) < size:
+        raise ValueError(f"Truncated correspondence file: {filepath}")
+
+    data = {'count': count, 'scores': None, 'desc_idx': None}
+    for name, dtype, shape, offset in layout:
+        if count == 0:
+            data[name] = np.zeros(shape, dtype=dtype)
+        else:
+            data[name] = np.memmap(filepath, dtype=dtype, mode=mode, offset=offset, shape=shape)
+    data['pts_left'] = data['points'][:, :2]
+    data['pts_right'] = data['points'][:, 2:]
+    return data
+
+def _flush(data):
+    for name in ('points', 'scores', 'desc_idx'):
+        if isinstance(data[name], np.memmap):
+            data[name].flush()
+
+def load_correspondences(filepath):
+    data = open_correspondences(filepath)
+    return data['pts_left'], data['pts_right']
+
+def write_correspondences(filepath, pts_left, pts_right, scores=None, desc_idx=None):
+    pts_left = np.asarray(pts_left).reshape(-1, 2)
+    pts_right = np.asarray(pts_right).reshape(-1, 2)
+    data = create_correspondence_file(filepath, len(pts_left), scores is not None,
+                                      desc_idx is not None)
+    data['pts_left'][:] = pts_left
+    data['pts_right'][:] = pts_right
+    if scores is not None:
+        data['scores'][:] = np.asarray(scores).reshape(-1)
+    if desc_idx is not None:
+        data['desc_idx'][:] = np.asarray(desc_idx).reshape(-1, 2)
+    _flush(data)
+    return data['count']
+
+def iter_correspondence_chunks(filepath, chunk_size=1 << 20):
+    data = open_correspondences(filepath)
+    for start in range(0, data['count'], chunk_size):
+        stop = min(start + chunk_size, data['count'])
+        chunk = {
+            'start': start,
+            'pts_left': np.array(data['pts_left'][start:stop]),
+            'pts_right': np.array(data['pts_right'][start:stop]),
+            'scores': None,
+            'desc_idx': None
+        }
+        if data['scores'] is not None:
+            chunk['scores'] = np.array(data['scores'][start:stop])
+        if data['desc_idx'] is not None:
+            chunk['desc_idx'] = np.array(data['desc_idx'][start:stop])
+        yield chunk
+
+def _append_file(dst, src_path, buffer_size=1 << 24):
+    with open(src_path, 'rb') as src:
+        while True:
+            block = src.read(buffer_size)
+            if not block:
+                break
+            dst.write(block)
+    os.remove(src_path)
+
+def _convert_text(text_path, output_path, side_paths, chunk_size):
+    columns = None
+    count = 0
+
+    with open(text_path, 'r') as src, open(output_path, 'wb') as out, \
+            open(side_paths[0], 'wb') as scores_out, open(side_paths[1], 'wb') as idx_out:
+        _write_header(out, 0, 0)
+        while True:
+            lines = list(islice(src, chunk_size))
+            if not lines:
+                break
+            chunk = np.loadtxt(lines, ndmin=2)
+            if len(chunk) == 0:
+                continue
+            if columns is None:
+                columns = chunk.shape[1]
+                if columns not in (4, 5, 7):
+                    raise ValueError(f"Expected 4, 5 or 7 columns (x y x' y' [score [idx idx']]), "
+                                     f"got {columns}")
+            elif chunk.shape[1] != columns:
+                raise ValueError(f"Inconsistent column count: expected {columns}, "
+                                 f"got {chunk.shape[1]} at match {count + 1}")
+            out.write(chunk[:, :4].astype(POINT_DTYPE).tobytes())
+            if columns >= 5:
+                scores_out.write(chunk[:, 4].astype(SCORE_DTYPE).tobytes())
+            if columns == 7:
+                idx_out.write(chunk[:, 5:7].astype(DESC_IDX_DTYPE).tobytes())
+            count += len(chunk)
+
+    flags = (FLAG_SCORES if columns and columns >= 5 else 0) | (FLAG_DESC_IDX if columns == 7 else 0)
+    with open(output_path, 'r+b') as out:
+        out.seek(0, os.SEEK_END)
+        for flag, path in zip((FLAG_SCORES, FLAG_DESC_IDX), side_paths):
+            if flags & flag:
+                _append_file(out, path)
+            else:
+                os.remove(path)
+        _write_header(out, count, flags)
+    return count
+
+def convert_text_matches(text_path, output_path, chunk_size=1 << 20):
+    tmp_path = f"{output_path}.tmp"
+    side_paths = [f"{output_path}.scores.tmp", f"{output_path}.desc_idx.tmp"]
+    try:
+        count = _convert_text(text_path, tmp_path, side_paths, chunk_size)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        for path in [tmp_path] + side_paths:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    return count
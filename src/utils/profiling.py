@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import threading
+import functools
+from collections import defaultdict
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'args', 'start')
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.profiler.events.append((self.name, self.start, end - self.start,
+                                     threading.get_ident(), self.args))
+        return False
+
+class Profiler:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.events = []
+        self.counters = defaultdict(float)
+        self.counter_lock = threading.Lock()
+        self.origin = time.perf_counter_ns()
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args or None)
+
+    def count(self, name, value=1):
+        if self.enabled:
+            with self.counter_lock:
+                self.counters[name] += value
+
+    def reset(self):
+        self.events = []
+        self.counters = defaultdict(float)
+        self.origin = time.perf_counter_ns()
+
+    def summary(self):
+        stages = {}
+        for name, _, duration, _, _ in self.events:
+            stage = stages.setdefault(name, {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            stage['calls'] += 1
+            stage['total_ms'] += duration / 1e6
+            stage['max_ms'] = max(stage['max_ms'], duration / 1e6)
+        for stage in stages.values():
+            stage['mean_ms'] = stage['total_ms'] / stage['calls']
+        with self.counter_lock:
+            counters = dict(self.counters)
+        return {'spans': stages, 'counters': counters}
+
+    def to_chrome_trace(self):
+        pid = os.getpid()
+        threads = {}
+        events = []
+        for name, start, duration, thread, args in self.events:
+            event = {'name': name, 'ph': 'X', 'pid': pid,
+                     'tid': threads.setdefault(thread, len(threads)),
+                     'ts': (start - self.origin) / 1e3, 'dur': duration / 1e3}
+            if args:
+                event['args'] = args
+            events.append(event)
+        end = max((start + duration for _, start, duration, _, _ in self.events), default=self.origin)
+        with self.counter_lock:
+            counters = dict(self.counters)
+        for name, value in counters.items():
+            events.append({'name': name, 'ph': 'C', 'pid': pid, 'tid': 0,
+                           'ts': (end - self.origin) / 1e3, 'args': {'value': value}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def save_chrome_trace(self, filepath):
+        with open(filepath, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+_profiler = Profiler(enabled=False)
+
+def get_profiler():
+    return _profiler
+
+def set_profiler(profiler):
+    global _profiler
+    previous = _profiler
+    _profiler = profiler
+    return previous
+
+def enable_profiling():
+    profiler = Profiler(enabled=True)
+    set_profiler(profiler)
+    return profiler
+
+def span(name, **args):
+    profiler = _profiler
+    if not profiler.enabled:
+        return _NULL_SPAN
+    return _Span(profiler, name, args or None)
+
+def count(name, value=1):
+    _profiler.count(name, value)
+
+def profiled(name=None):
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with _Span(profiler, span_name, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
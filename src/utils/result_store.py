@@ -0,0 +1,160 @@
+import json
+import sqlite3
+import time
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task TEXT NOT NULL,
+    run_id TEXT,
+    created REAL NOT NULL,
+    F BLOB,
+    e_left_x REAL, e_left_y REAL,
+    e_right_x REAL, e_right_y REAL,
+    n_points INTEGER,
+    inlier_count INTEGER,
+    inlier_mask BLOB,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS values_ (
+    run INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run, kind, name)
+);
+CREATE INDEX IF NOT EXISTS runs_task ON runs(task, created);
+"""
+
+def _scalar_items(values):
+    for name, value in (values or {}).items():
+        if isinstance(value, (bool, int, float, np.integer, np.floating)):
+            yield name, float(value)
+
+class ResultStore:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def add(self, task, F, inlier_mask=None, epipoles=None, metrics=None, timings=None,
+            params=None, run_id=None):
+        e_left, e_right = epipoles if epipoles is not None else ((None, None), (None, None))
+        mask_blob, n_points, inlier_count = None, None, None
+        if inlier_mask is not None:
+            inlier_mask = np.asarray(inlier_mask, dtype=bool)
+            mask_blob = np.packbits(inlier_mask).tobytes()
+            n_points = len(inlier_mask)
+            inlier_count = int(np.sum(inlier_mask))
+        F_blob = np.asarray(F, dtype='<f8').reshape(9).tobytes() if F is not None else None
+
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (task, run_id, created, F, e_left_x, e_left_y, e_right_x, "
+                "e_right_y, n_points, inlier_count, inlier_mask, params) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (task, run_id, time.time(), F_blob,
+                 *[None if v is None else float(v) for v in (*e_left, *e_right)],
+                 n_points, inlier_count, mask_blob,
+                 json.dumps(params) if params is not None else None))
+            row = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO values_ (run, kind, name, value) VALUES (?, ?, ?, ?)",
+                [(row, 'metric', name, value) for name, value in _scalar_items(metrics)] +
+                [(row, 'timing', name, value) for name, value in _scalar_items(timings)])
+        return row
+
+    def query(self, task=None, run_id=None, since=None, limit=None):
+        clauses, args = [], []
+        for column, op, value in (('task', '=', task), ('run_id', '=', run_id),
+                                  ('created', '>=', since)):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                args.append(value)
+        sql = ("SELECT id, task, run_id, created, F, e_left_x, e_left_y, e_right_x, e_right_y, "
+               "n_points, inlier_count FROM runs")
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if limit is None:
+            rows = self.conn.execute(sql + " ORDER BY created, id", args).fetchall()
+        else:
+            rows = self.conn.execute(sql + " ORDER BY created DESC, id DESC LIMIT ?",
+                                     args + [int(limit)]).fetchall()[::-1]
+
+        ids = np.array([r[0] for r in rows], dtype=np.int64)
+        nan_F = np.full(9, np.nan).tobytes()
+        F = np.frombuffer(b''.join(r[4] or nan_F for r in rows), dtype='<f8').reshape(-1, 3, 3)
+        numeric = np.array([r[5:11] for r in rows], dtype=np.float64).reshape(-1, 6)
+        result = {
+            'id': ids,
+            'task': [r[1] for r in rows],
+            'run_id': [r[2] for r in rows],
+            'created': np.array([r[3] for r in rows], dtype=np.float64),
+            'F': F,
+            'e_left': numeric[:, 0:2],
+            'e_right': numeric[:, 2:4],
+            'n_points': numeric[:, 4],
+            'inlier_count': numeric[:, 5],
+            'metrics': {},
+            'timings': {}
+        }
+        if len(ids) == 0:
+            return result
+
+        where = " WHERE " + " AND ".join(f"runs.{c}" for c in clauses) if clauses else ""
+        values = self.conn.execute(
+            "SELECT values_.run, values_.kind, values_.name, values_.value FROM values_ "
+            "JOIN runs ON runs.id = values_.run" + where, args).fetchall()
+        if not values:
+            return result
+
+        runs = np.array([v[0] for v in values], dtype=np.int64)
+        order = np.argsort(ids)
+        position = order[np.clip(np.searchsorted(ids[order], runs), 0, len(ids) - 1)]
+        present = ids[position] == runs
+        data = np.array([np.nan if v[3] is None else v[3] for v in values], dtype=np.float64)
+        keys = np.array([f"{v[1]}:{v[2]}" for v in values])
+        names, inverse = np.unique(keys[present], return_inverse=True)
+
+        table = np.full((len(names), len(ids)), np.nan)
+        table[inverse, position[present]] = data[present]
+        for key, row in zip(names.tolist(), table):
+            kind, name = key.split(':', 1)
+            result['metrics' if kind == 'metric' else 'timings'][name] = row
+        return result
+
+    def latest(self, task):
+        result = self.query(task=task, limit=1)
+        if len(result['id']) == 0:
+            return None
+        record = {key: value[0] for key, value in result.items() if key not in ('metrics', 'timings')}
+        record['metrics'] = {name: value[0] for name, value in result['metrics'].items()}
+        record['timings'] = {name: value[0] for name, value in result['timings'].items()}
+        return record
+
+    def get_inlier_mask(self, row):
+        found = self.conn.execute("SELECT inlier_mask, n_points FROM runs WHERE id = ?",
+                                  (int(row),)).fetchone()
+        if found is None or found[0] is None:
+            return None
+        return np.unpackbits(np.frombuffer(found[0], dtype=np.uint8), count=found[1]).astype(bool)
+
+    def get_params(self, row):
+        found = self.conn.execute("SELECT params FROM runs WHERE id = ?", (int(row),)).fetchone()
+        if found is None or found[0] is None:
+            return None
+        return json.loads(found[0])
+
+    def tasks(self):
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT task FROM runs ORDER BY task")]
@@ -0,0 +1,83 @@
+import numpy as np
+
+def skew(v):
+    return np.array([[0, -v[2], v[1]],
+                     [v[2], 0, -v[0]],
+                     [-v[1], v[0], 0]])
+
+def random_rotation(rng, max_angle=0.3):
+    axis = rng.normal(size=3)
+    axis /= np.linalg.norm(axis)
+    angle = rng.uniform(-max_angle, max_angle)
+    K = skew(axis)
+    return np.eye(3) + np.sin(angle) * K + (1 - np.cos(angle)) * K @ K
+
+def random_intrinsics(rng, image_size):
+    w, h = image_size
+    f = rng.uniform(0.8, 1.2) * max(w, h)
+    return np.array([[f, 0, w / 2], [0, f, h / 2], [0, 0, 1.0]])
+
+def fundamental_from_pose(K_left, K_right, R, t):
+    E = skew(t) @ R
+    F = np.linalg.inv(K_right).T @ E @ np.linalg.inv(K_left)
+    return F / np.linalg.norm(F)
+
+def project(K, X):
+    x = X @ K.T
+    return x[:, :2] / x[:, 2:]
+
+def generate_two_view_scene(n_points, noise_std=0.5, outlier_ratio=0.0, image_size=(1280, 960),
+                            depth_range=(4.0, 12.0), seed=None):
+    rng = np.random.default_rng(seed)
+    w, h = image_size
+    K_left = random_intrinsics(rng, image_size)
+    K_right = random_intrinsics(rng, image_size)
+    R = random_rotation(rng)
+    t = rng.normal(size=3) * np.array([1.0, 0.3, 0.3])
+    t /= np.linalg.norm(t)
+
+    X = np.empty((0, 3))
+    x_left = np.empty((0, 2))
+    x_right = np.empty((0, 2))
+    while len(X) < n_points:
+        count = 2 * (n_points - len(X)) + 16
+        pixels = rng.uniform([0, 0], [w, h], size=(count, 2))
+        depth = rng.uniform(*depth_range, size=(count, 1))
+        rays = np.hstack([pixels, np.ones((count, 1))]) @ np.linalg.inv(K_left).T
+        candidates = rays * depth
+        camera_right = candidates @ R.T + t
+        visible = camera_right[:, 2] > 0.1
+        projected = project(K_right, camera_right[visible])
+        inside = np.all((projected >= 0) & (projected < [w, h]), axis=1)
+        X = np.vstack([X, candidates[visible][inside]])
+        x_left = np.vstack([x_left, pixels[visible][inside]])
+        x_right = np.vstack([x_right, projected[inside]])
+
+    X, x_left, x_right = X[:n_points], x_left[:n_points], x_right[:n_points]
+    pts_left = x_left + rng.normal(scale=noise_std, size=x_left.shape)
+    pts_right = x_right + rng.normal(scale=noise_std, size=x_right.shape)
+
+    inlier_mask = np.ones(n_points, dtype=bool)
+    n_outliers = int(round(outlier_ratio * n_points))
+    outliers = rng.choice(n_points, n_outliers, replace=False)
+    pts_right[outliers] = rng.uniform([0, 0], [w, h], size=(n_outliers, 2))
+    inlier_mask[outliers] = False
+
+    return {
+        'pts_left': pts_left,
+        'pts_right': pts_right,
+        'inlier_mask': inlier_mask,
+        'clean_left': x_left,
+        'clean_right': x_right,
+        'points_3d': X,
+        'F': fundamental_from_pose(K_left, K_right, R, t),
+        'K_left': K_left,
+        'K_right': K_right,
+        'R': R,
+        't': t
+    }
+
+def fundamental_error(F_est, F_true):
+    F_est = F_est / np.linalg.norm(F_est)
+    F_true = F_true / np.linalg.norm(F_true)
+    return min(np.linalg.norm(F_est - F_true), np.linalg.norm(F_est + F_true))
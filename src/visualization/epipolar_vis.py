@@ -1,62 +1,97 @@
 import cv2
 import numpy as np
 
-def get_line_endpoints(line, img_shape):
-    a, b, c = line
+def clip_lines_to_image(lines, img_shape):
+    lines = np.asarray(lines, dtype=np.float64).reshape(-1, 3)
+    a, b, c = lines[:, 0], lines[:, 1], lines[:, 2]
     h, w = img_shape[:2]
-    points = []
-
-    if abs(b) > 1e-6:
-        y = 0
-        x = -(b*y + c) / a
-        if 0 <= x < w:
-            points.append((int(x), int(y)))
-
-        y = h - 1
-        x = -(b*y + c) / a
-        if 0 <= x < w:
-            points.append((int(x), int(y)))
-
-    if abs(a) > 1e-6:
-        x = 0
-        y = -(a*x + c) / b
-        if 0 <= y < h:
-            points.append((int(x), int(y)))
-
-        x = w - 1
-        y = -(a*x + c) / b
-        if 0 <= y < h:
-            points.append((int(x), int(y)))
-
-    if len(points) >= 2:
-        return points[0], points[1]
-    return None
-
-def draw_epipolar_lines(img, F, points_other_view, epipole, direction='left_to_right', num_lines=20):
-    img_draw = img.copy()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        candidates = np.stack([
+            np.stack([-c / a, np.zeros_like(a)], axis=1),
+            np.stack([-(b*(h - 1) + c) / a, np.full_like(a, h - 1)], axis=1),
+            np.stack([np.zeros_like(b), -c / b], axis=1),
+            np.stack([np.full_like(b, w - 1), -(a*(w - 1) + c) / b], axis=1)
+        ], axis=1)
+
+    valid = np.zeros(candidates.shape[:2], dtype=bool)
+    valid[:, :2] = (np.abs(a) > 1e-6)[:, None]
+    valid[:, 2:] = (np.abs(b) > 1e-6)[:, None]
+    valid &= ((candidates[..., 0] >= 0) & (candidates[..., 0] <= w - 1) &
+              (candidates[..., 1] >= 0) & (candidates[..., 1] <= h - 1))
+
+    with np.errstate(invalid='ignore'):
+        diff = candidates[:, :, None, :] - candidates[:, None, :, :]
+        separation = np.sum(diff**2, axis=-1)
+    separation[~(valid[:, :, None] & valid[:, None, :])] = -1
+    flat = np.argmax(separation.reshape(len(lines), -1), axis=1)
+    first, second = np.divmod(flat, 4)
+
+    rows = np.arange(len(lines))
+    endpoints = np.stack([candidates[rows, first], candidates[rows, second]], axis=1)
+    return endpoints, separation.reshape(len(lines), -1)[rows, flat] >= 0
+
+def get_line_endpoints(line, img_shape):
+    endpoints, valid = clip_lines_to_image(line, img_shape)
+    if not valid[0]:
+        return None
+    (x1, y1), (x2, y2) = endpoints[0].astype(int)
+    return (int(x1), int(y1)), (int(x2), int(y2))
+
+def compute_preview_scale(img_shape, preview_width):
+    if preview_width is None:
+        return 1.0
+    return min(1.0, preview_width / img_shape[1])
+
+def resize_for_preview(img, scale):
+    if scale >= 1.0:
+        return img.copy()
+    h, w = img.shape[:2]
+    size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+    step = int(1 / scale)
+    if step > 1:
+        img = np.ascontiguousarray(img[::step, ::step])
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+
+def draw_segments(img, segments, color, thickness=1):
+    if len(segments):
+        cv2.polylines(img, np.round(segments).astype(np.int32), False, color, thickness)
+
+def draw_points(img, points, color, radius=3):
+    points = np.round(points).astype(np.int32)
+    draw_segments(img, np.stack([points, points], axis=1), color, 2*radius + 1)
+
+def subsample_indices(count, max_count):
+    if max_count is None or count <= max_count:
+        return np.arange(count)
+    return np.linspace(0, count - 1, max_count).astype(int)
+
+def draw_epipolar_lines(img, F, points_other_view, epipole, direction='left_to_right', num_lines=20,
+                        preview_width=None):
+    scale = compute_preview_scale(img.shape, preview_width)
+    img_draw = resize_for_preview(img, scale)
     if len(img_draw.shape) == 2:
         img_draw = cv2.cvtColor(img_draw, cv2.COLOR_GRAY2BGR)
 
-    points_to_draw = points_other_view[:num_lines]
-
-    for pt in points_to_draw:
-        if direction == 'left_to_right':
-            line = F @ np.array([pt[0], pt[1], 1])
-        else:
-            line = F.T @ np.array([pt[0], pt[1], 1])
+    points = np.asarray(points_other_view, dtype=np.float64)[:num_lines]
+    hom = np.hstack([points, np.ones((len(points), 1))])
+    lines = hom @ (F.T if direction == 'left_to_right' else F)
 
-        endpoints = get_line_endpoints(line, img_draw.shape)
-        if endpoints:
-            cv2.line(img_draw, endpoints[0], endpoints[1], (255, 0, 0), 1)
+    endpoints, valid = clip_lines_to_image(lines, img.shape)
+    draw_segments(img_draw, endpoints[valid] * scale, (255, 0, 0), 1)
 
     if 0 <= epipole[0] < img.shape[1] and 0 <= epipole[1] < img.shape[0]:
-        cv2.circle(img_draw, (int(epipole[0]), int(epipole[1])), 5, (0, 0, 255), -1)
-    else:
-        pass
+        cv2.circle(img_draw, (int(epipole[0] * scale), int(epipole[1] * scale)), 5, (0, 0, 255), -1)
 
     return img_draw
 
-def draw_matches_with_inliers(img1, kp1, img2, kp2, matches, inlier_mask):
+def draw_matches_with_inliers(img1, kp1, img2, kp2, matches, inlier_mask, preview_width=None,
+                              max_matches=None):
+    inlier_mask = np.asarray(inlier_mask, dtype=bool)
+    scale = compute_preview_scale((img1.shape[0], img1.shape[1] + img2.shape[1]), preview_width)
+    img1 = resize_for_preview(img1, scale)
+    img2 = resize_for_preview(img2, scale)
+
     h1, w1 = img1.shape[:2]
     h2, w2 = img2.shape[:2]
     out_img = np.zeros((max(h1, h2), w1 + w2, 3), dtype=np.uint8)
@@ -69,14 +104,16 @@ def draw_matches_with_inliers(img1, kp1, img2, kp2, matches, inlier_mask):
     out_img[:h1, :w1] = img1
     out_img[:h2, w1:w1+w2] = img2
 
-    for i, match in enumerate(matches):
-        pt1 = tuple(map(int, kp1[match.queryIdx].pt))
-        pt2 = tuple(map(int, (kp2[match.trainIdx].pt[0] + w1, kp2[match.trainIdx].pt[1])))
+    selected = subsample_indices(len(matches), max_matches)
+    pt1 = np.float32([kp1[matches[i].queryIdx].pt for i in selected]).reshape(-1, 2) * scale
+    pt2 = np.float32([kp2[matches[i].trainIdx].pt for i in selected]).reshape(-1, 2) * scale
+    pt2[:, 0] += w1
+    radius = max(1, int(round(3 * scale)))
 
-        color = (0, 255, 0) if inlier_mask[i] else (0, 0, 255)
-        cv2.line(out_img, pt1, pt2, color, 1)
-        cv2.circle(out_img, pt1, 3, color, -1)
-        cv2.circle(out_img, pt2, 3, color, -1)
+    for mask, color in ((~inlier_mask[selected], (0, 0, 255)), (inlier_mask[selected], (0, 255, 0))):
+        draw_segments(out_img, np.stack([pt1[mask], pt2[mask]], axis=1), color, 1)
+        draw_points(out_img, pt1[mask], color, radius)
+        draw_points(out_img, pt2[mask], color, radius)
 
     inlier_count = np.sum(inlier_mask)
     total_count = len(matches)